@@ -1,29 +1,126 @@
 import pandas as pd
 import numpy as np
-import datetime
+import threading
+import time
+from typing import Optional
+from sqlalchemy import Integer, cast, func, literal
 from sqlalchemy.orm import Session
-from .models import Question, Topic, StudentAnswer, Subject
+from .models import Question, Topic, StudentAnswer, Subject, AnswerSummary
+from .weights import ImportanceProfile, DEFAULT_PROFILE, recency_scores
 
-def calculate_priorities(db: Session, student_id: int):
+# Normalized components combined by the profile weights, in weight order
+IMPORTANCE_COMPONENTS = ["norm_freq", "norm_marks", "norm_recency"]
+
+# Uploads only invalidate the cache of the worker that handled them;
+# other workers pick up new questions when their entry expires
+IMPORTANCE_CACHE_SECONDS = 300
+
+class ImportanceCache:
     """
-    Core Analytics Engine for Study Priority.
-    
-    Formula:
-    Priority = Topic Importance * (1 - Student Mastery)
-    
-    1. Topic Importance (Global):
-       - Frequency: How often it appears in exams
-       - Weightage: Total marks associated
-       - Recency: Weighted more if appeared in recent years
-       
-    2. Student Mastery (Personal):
-       - Accuracy: Correct / Total Attempts
-       - Damping: Low attempts (<3) reduce confidence in high mastery scores
-       
-    Returns:
-       List of topics with priority scores and actionable recommendations.
+    Per-catalog cache of aggregated topic stats (see `aggregate_topic_stats`).
+    Keyed by exam_id (None = the global, unscoped catalog). Entries expire
+    after `ttl` seconds and are invalidated when questions are uploaded to
+    the catalog.
+
+    Each entry also records the catalog version it was computed from (see
+    `catalog_version`) and is only served for that version. A frame cached
+    from a lagging replica right after an upload is thus replaced as soon as
+    a read sees the new questions, instead of lingering until the TTL.
+    """
+
+    def __init__(self, ttl: float = IMPORTANCE_CACHE_SECONDS):
+        self.ttl = ttl
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def get(self, exam_id: Optional[int], version=None):
+        with self._lock:
+            cached = self._frames.get(exam_id)
+        if cached is None or cached[0] <= time.monotonic() or cached[1] != version:
+            return None
+        return cached[2]
+
+    def set(self, exam_id: Optional[int], frame: pd.DataFrame, version=None):
+        with self._lock:
+            self._frames[exam_id] = (time.monotonic() + self.ttl, version, frame)
+
+    def invalidate(self, exam_id: Optional[int] = None):
+        # The global catalog covers every exam, so it is always dropped too
+        with self._lock:
+            self._frames.pop(exam_id, None)
+            self._frames.pop(None, None)
+
+# Shared cache used by the API
+importance_cache = ImportanceCache()
+
+def mastery_from_counts(correct, attempts) -> float:
+    """
+    Damped accuracy for one (student, topic): correct / attempts,
+    scaled by 0.7 when there are fewer than 3 attempts.
+    """
+    if attempts == 0:
+        return 0.0
+    score = correct / attempts
+    if attempts < 3:
+        # Penalize confidence. Trust purely positive results less.
+        return score * 0.7 
+    return score
+
+def categorize(priority, mastery, rank_pct):
+    """
+    Actionable category per topic (Percentile Based). Works element-wise on
+    arrays of any shape, e.g. one row per what-if scenario.
+
+    rank_pct is the percentile rank in priority order: 0.0 (top) to 1.0 (bottom).
+    Edge case: If Mastery > 0.9, force "Mastered"
+    Edge case: If Priority is 0, force "Deprioritize" regardless of rank
+    """
+    return np.select(
+        [
+            mastery > 0.9,
+            priority == 0,
+            rank_pct < 0.20,   # Top 20%
+            rank_pct < 0.70,   # Next 50%
+        ],
+        ["Mastered", "Deprioritize", "Study Now", "Revise Later"],
+        default="Deprioritize",  # Bottom 30%
+    ).astype(object)
+
+def calculate_priorities(db: Session, student_id: int, exam_id: Optional[int] = None):
+    """
+    Returns the ranked priority list for a student as a list of dicts.
+    See `build_priority_frame` for the scoring model.
+    """
+    final_df = build_priority_frame(db, student_id, exam_id)
+    return final_df.to_dict(orient="records")
+
+# Robust Normalization Helper
+# Scales values between 0.0 and 1.0 safely
+def robust_normalize(series):
+    if series.empty: return series
+    _min, _max = series.min(), series.max()
+    if _max == _min:
+        # If all topics have same stats, they are equally important (1.0) if > 0
+        return pd.Series([1.0 if x > 0 else 0.0 for x in series], index=series.index) 
+    return (series - _min) / (_max - _min)
+
+def calculate_topic_importance(
+    db: Session,
+    exam_id: Optional[int] = None,
+    profile: ImportanceProfile = DEFAULT_PROFILE,
+) -> pd.DataFrame:
+    """
+    Topic Importance (Global) for a catalog under a weight profile.
+    Returns an empty DataFrame if there are no questions.
+    """
+    return apply_profile(aggregate_topic_stats(db, exam_id), profile)
+
+def aggregate_topic_stats(db: Session, exam_id: Optional[int] = None) -> pd.DataFrame:
+    """
+    Profile-independent part of topic importance: per-topic frequency,
+    marks and average year, with frequency and marks min-max normalized.
+    This is the expensive step and is what `ImportanceCache` stores.
     """
-    
     # ---------------------------------------------------------
     # 1. Fetch Data
     # ---------------------------------------------------------
@@ -34,22 +131,19 @@ def calculate_priorities(db: Session, student_id: int):
         Topic.id.label("topic_id"),
         Topic.name.label("topic_name"),
         Subject.name.label("subject_name")
-    ).select_from(Question).join(Topic).join(Subject).statement
+    ).select_from(Question).join(Topic).join(Subject)
+    if exam_id is not None:
+        # Served by the exam_id index: cost scales with this catalog only
+        query = query.filter(Question.exam_id == exam_id)
     
-    df_questions = pd.read_sql(query, db.bind)
+    df_questions = pd.read_sql(query.statement, db.bind)
     
     if df_questions.empty:
-        return []
+        return pd.DataFrame()
 
     # ---------------------------------------------------------
     # 2. Calculate Topic Importance (Global)
     # ---------------------------------------------------------
-    
-    # Weights for Importance Formula
-    W_FREQ = 0.35
-    W_MARKS = 0.45
-    W_RECENCY = 0.20
-    CURRENT_YEAR = datetime.datetime.now().year
 
     # Aggregation
     topic_stats = df_questions.groupby(["topic_id", "topic_name", "subject_name"]).agg(
@@ -60,46 +154,82 @@ def calculate_priorities(db: Session, student_id: int):
         avg_year=("year", "mean") 
     ).reset_index()
 
-    # Robust Normalization Helper
-    # Scales values between 0.0 and 1.0 safely
-    def robust_normalize(series):
-        if series.empty: return series
-        _min, _max = series.min(), series.max()
-        if _max == _min:
-            # If all topics have same stats, they are equally important (1.0) if > 0
-            return pd.Series([1.0 if x > 0 else 0.0 for x in series]) 
-        return (series - _min) / (_max - _min)
-
     topic_stats["norm_freq"] = robust_normalize(topic_stats["frequency"])
     topic_stats["norm_marks"] = robust_normalize(topic_stats["total_marks"])
+
+    return topic_stats
+
+def catalog_version(db: Session, exam_id: Optional[int] = None):
+    """Highest question id in the catalog; changes whenever questions are added."""
+    query = db.query(func.max(Question.id))
+    if exam_id is not None:
+        query = query.filter(Question.exam_id == exam_id)
+    return query.scalar()
+
+def cached_topic_stats(db: Session, exam_id: Optional[int] = None, cache: Optional[ImportanceCache] = None) -> pd.DataFrame:
+    """
+    `aggregate_topic_stats`, served from `cache` when one is given and its
+    entry matches the catalog version seen by `db`.
+    """
+    if cache is None:
+        return aggregate_topic_stats(db, exam_id)
+    version = catalog_version(db, exam_id)
+    topic_stats = cache.get(exam_id, version)
+    if topic_stats is None:
+        topic_stats = aggregate_topic_stats(db, exam_id)
+        cache.set(exam_id, topic_stats, version)
+    return topic_stats
+
+def apply_profile(topic_stats: pd.DataFrame, profile: ImportanceProfile = DEFAULT_PROFILE) -> pd.DataFrame:
+    """
+    Adds the recency component and `importance_score` for a weight profile.
+    Only vector operations over the topics; the cached frame is not modified.
+    """
+    if topic_stats.empty:
+        return topic_stats
+    topic_stats = topic_stats.copy()
     
-    # Recency Calculation:
+    # Recency Calculation (curve chosen by the profile, hyperbolic by default):
     # 1 / (Age_Gap + 1). Recent years (gap=0) get score 1.0. Old years get lower.
     # We use avg_year to smooth out one-off appearances.
-    topic_stats["recency_raw"] = topic_stats["avg_year"].apply(lambda y: 1 / (CURRENT_YEAR - y + 1) if (CURRENT_YEAR - y) >= 0 else 0.1)
+    topic_stats["recency_raw"] = recency_scores(topic_stats["avg_year"].to_numpy(), profile)
     topic_stats["norm_recency"] = robust_normalize(topic_stats["recency_raw"])
 
     # Final Importance Score
-    topic_stats["importance_score"] = (
-        (topic_stats["norm_freq"] * W_FREQ) + 
-        (topic_stats["norm_marks"] * W_MARKS) + 
-        (topic_stats["norm_recency"] * W_RECENCY)
-    )
+    topic_stats["importance_score"] = topic_stats[IMPORTANCE_COMPONENTS].to_numpy() @ np.asarray(profile.weights)
 
+    return topic_stats
+
+def calculate_student_mastery(db: Session, student_id: int, exam_id: Optional[int] = None) -> pd.DataFrame:
+    """
+    Student Mastery (Personalized) per topic the student has attempted.
+    Returns a DataFrame with at least `topic_id` and `mastery_score`.
+    Recent answers are read raw; archived ones from their summaries (see archival.py).
+    """
     # ---------------------------------------------------------
     # 3. Calculate Student Mastery (Personalized)
     # ---------------------------------------------------------
+    # One row per recent answer (1 attempt) plus one per archived summary
     ans_query = db.query(
-        StudentAnswer.is_correct,
-        Question.topic_id
-    ).join(Question).filter(StudentAnswer.test_result.has(student_id=student_id)).statement
+        cast(StudentAnswer.is_correct, Integer).label("is_correct"),
+        Question.topic_id.label("topic_id"),
+        literal(1, Integer).label("attempts"),
+    ).join(Question).filter(StudentAnswer.test_result.has(student_id=student_id))
+    summary_query = db.query(
+        AnswerSummary.correct,
+        AnswerSummary.topic_id,
+        AnswerSummary.attempts,
+    ).filter(AnswerSummary.student_id == student_id)
+    if exam_id is not None:
+        ans_query = ans_query.filter(Question.exam_id == exam_id)
+        summary_query = summary_query.filter(AnswerSummary.exam_id == exam_id)
 
-    df_answers = pd.read_sql(ans_query, db.bind)
+    df_answers = pd.read_sql(ans_query.union_all(summary_query).statement, db.bind)
 
     if not df_answers.empty:
         mastery_stats = df_answers.groupby("topic_id").agg(
             correct=("is_correct", "sum"),
-            attempts=("is_correct", "count")
+            attempts=("attempts", "sum")
         ).reset_index()
         
         # Raw Mastery = Accuracy
@@ -112,17 +242,53 @@ def calculate_priorities(db: Session, student_id: int):
         # (unless it's 0, then it stays 0). 
         # Better approach: Bayesian average or simple penalization.
         def adjust_mastery(row):
-            score = row["raw_mastery"]
-            if row["attempts"] < 3:
-                # Penalize confidence. Trust purely positive results less.
-                return score * 0.7 
-            return score
+            return mastery_from_counts(row["correct"], row["attempts"])
 
         mastery_stats["mastery_score"] = mastery_stats.apply(adjust_mastery, axis=1)
         
     else:
         mastery_stats = pd.DataFrame(columns=["topic_id", "mastery_score"])
 
+    return mastery_stats
+
+def build_priority_frame(
+    db: Session,
+    student_id: int,
+    exam_id: Optional[int] = None,
+    cache: Optional[ImportanceCache] = None,
+    profile: ImportanceProfile = DEFAULT_PROFILE,
+) -> pd.DataFrame:
+    """
+    Core Analytics Engine for Study Priority.
+
+    Formula:
+    Priority = Topic Importance * (1 - Student Mastery)
+
+    1. Topic Importance (Global):
+       - Frequency: How often it appears in exams
+       - Weightage: Total marks associated
+       - Recency: Weighted more if appeared in recent years
+
+    2. Student Mastery (Personal):
+       - Accuracy: Correct / Total Attempts
+       - Damping: Low attempts (<3) reduce confidence in high mastery scores
+
+    If `exam_id` is given, only that catalog's topics and answers are scored.
+    If `cache` is given, topic importance is reused across calls per catalog.
+    `profile` sets the importance weights and recency curve.
+
+    Returns:
+       DataFrame of topics with priority scores and actionable recommendations,
+       sorted by priority (empty if there are no questions).
+    """
+
+    topic_stats = apply_profile(cached_topic_stats(db, exam_id, cache), profile)
+
+    if topic_stats.empty:
+        return pd.DataFrame()
+
+    mastery_stats = calculate_student_mastery(db, student_id, exam_id)
+
     # ---------------------------------------------------------
     # 4. Integrate Data
     # ---------------------------------------------------------
@@ -145,38 +311,13 @@ def calculate_priorities(db: Session, student_id: int):
     final_df = final_df.sort_values(by="priority_score", ascending=False).reset_index(drop=True)
     
     n_topics = len(final_df)
-    
-    def get_category(index):
-        if n_topics == 0: return "N/A"
-        # Percentile rank: 0.0 (top) to 1.0 (bottom)
-        rank_pct = index / n_topics 
-        
-        if rank_pct < 0.20:
-            return "Study Now"     # Top 20%
-        elif rank_pct < 0.70:
-            return "Revise Later"  # Next 50%
-        else:
-            return "Deprioritize"  # Bottom 30%
-
-    # Apply ranking logic
-    # Edge case: If Priority is very low (e.g. < 0.1), force Deprioritize regardless of rank
-    # Edge case: If Mastery > 0.9, force "Revise" or "Mastered"
-    
-    categories = []
-    for idx, row in final_df.iterrows():
-        p_score = row["priority_score"]
-        m_score = row["mastery_score"]
-        
-        if m_score > 0.9:
-            categories.append("Mastered")
-        elif p_score == 0:
-             categories.append("Deprioritize")
-        else:
-            categories.append(get_category(idx))
-            
-    final_df["recommendation"] = categories
+    final_df["recommendation"] = categorize(
+        final_df["priority_score"].to_numpy(),
+        final_df["mastery_score"].to_numpy(),
+        np.arange(n_topics) / n_topics,
+    )
 
     # Create final response with correct column names matching schema
     final_df = final_df.rename(columns={"subject_name": "subject"})
     
-    return final_df.to_dict(orient="records")
+    return final_df
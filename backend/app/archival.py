@@ -0,0 +1,158 @@
+import os
+import gzip
+import json
+import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from .models import AnswerSummary, Question, StudentAnswer, TestResult
+
+# Answers from tests taken more than this many days ago are compacted
+ARCHIVE_HORIZON_DAYS = int(os.getenv("ARCHIVE_HORIZON_DAYS", "365"))
+
+# Raw rows are kept here as gzipped JSON lines, one file per batch
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "./archive")
+
+# Answers compacted per transaction (and per archive file)
+ARCHIVE_BATCH_SIZE = 50000
+
+# Keeps IN (...) lists well under database parameter limits
+LOOKUP_CHUNK_SIZE = 500
+
+ARCHIVE_FIELDS = (
+    "id", "test_result_id", "question_id", "is_correct", "time_taken_seconds",
+    "student_id", "taken_at", "topic_id", "exam_id",
+)
+
+def period_start(taken_at: datetime.datetime) -> datetime.date:
+    """Summary period of an answer: the month its test was taken."""
+    return taken_at.date().replace(day=1)
+
+def _chunks(items, size=LOOKUP_CHUNK_SIZE):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _write_archive(rows, archive_dir: str) -> str:
+    """Writes one batch of raw answers; the file only appears once complete."""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"student_answers_{rows[0].id}-{rows[-1].id}.jsonl.gz")
+    with gzip.open(path + ".tmp", "wt", encoding="utf-8") as f:
+        for row in rows:
+            record = dict(zip(ARCHIVE_FIELDS, row))
+            record["taken_at"] = record["taken_at"].isoformat()
+            f.write(json.dumps(record) + "\n")
+    os.replace(path + ".tmp", path)
+    return path
+
+def _fold_into_summaries(db: Session, rows) -> int:
+    """Adds a batch of answers to the (student, topic, exam, month) summaries. Does not commit."""
+    counts = {}
+    for row in rows:
+        key = (row.student_id, row.topic_id, row.exam_id, period_start(row.taken_at))
+        correct, attempts, seconds, timed = counts.get(key, (0, 0, 0, 0))
+        if row.time_taken_seconds is not None:
+            seconds, timed = seconds + row.time_taken_seconds, timed + 1
+        counts[key] = (correct + int(bool(row.is_correct)), attempts + 1, seconds, timed)
+
+    existing = {}
+    periods = {key[3] for key in counts}
+    for student_ids in _chunks({key[0] for key in counts}):
+        for summary in db.query(AnswerSummary).filter(
+            AnswerSummary.student_id.in_(student_ids),
+            AnswerSummary.period_start.in_(periods),
+        ):
+            existing[(summary.student_id, summary.topic_id, summary.exam_id, summary.period_start)] = summary
+
+    for key, (correct, attempts, seconds, timed) in counts.items():
+        summary = existing.get(key)
+        if summary is None:
+            student_id, topic_id, exam_id, start = key
+            db.add(AnswerSummary(
+                student_id=student_id, topic_id=topic_id, exam_id=exam_id, period_start=start,
+                correct=correct, attempts=attempts, time_taken_seconds=seconds, timed_attempts=timed,
+            ))
+        else:
+            summary.correct += correct
+            summary.attempts += attempts
+            summary.time_taken_seconds += seconds
+            summary.timed_attempts += timed
+    return len(counts)
+
+def compact_answers(
+    db: Session,
+    horizon_days: int = ARCHIVE_HORIZON_DAYS,
+    archive_dir: str = ARCHIVE_DIR,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    now: Optional[datetime.datetime] = None,
+) -> dict:
+    """
+    Moves answers older than `horizon_days` out of `student_answers`.
+
+    Per batch (in answer id order):
+      1. The raw rows are written to a compressed archive file.
+      2. They are folded into `AnswerSummary` rows, and
+      3. deleted from `student_answers`, with 2 and 3 in one transaction.
+    A batch whose transaction fails leaves the database untouched and its
+    archive file is removed, so the job can simply be re-run.
+
+    Mastery and effort estimates read the summaries alongside the recent raw
+    answers, so the results are unchanged. Returns counts of the work done.
+    """
+    cutoff = (now or datetime.datetime.utcnow()) - datetime.timedelta(days=horizon_days)
+    stats = {"answers": 0, "summaries": 0, "files": []}
+    last_id = 0
+    while True:
+        rows = db.query(
+            StudentAnswer.id,
+            StudentAnswer.test_result_id,
+            StudentAnswer.question_id,
+            StudentAnswer.is_correct,
+            StudentAnswer.time_taken_seconds,
+            TestResult.student_id,
+            TestResult.taken_at,
+            Question.topic_id,
+            Question.exam_id,
+        ).join(TestResult, StudentAnswer.test_result_id == TestResult.id).join(
+            Question, StudentAnswer.question_id == Question.id
+        ).filter(
+            TestResult.taken_at < cutoff,
+            StudentAnswer.id > last_id,
+        ).order_by(StudentAnswer.id).limit(batch_size).all()
+        if not rows:
+            return stats
+
+        path = _write_archive(rows, archive_dir)
+        try:
+            summaries = _fold_into_summaries(db, rows)
+            for ids in _chunks(row.id for row in rows):
+                db.query(StudentAnswer).filter(StudentAnswer.id.in_(ids)).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            os.remove(path)
+            raise
+
+        stats["answers"] += len(rows)
+        stats["summaries"] += summaries
+        stats["files"].append(path)
+        last_id = rows[-1].id
+
+if __name__ == "__main__":
+    import argparse
+    from .database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Compact old answers into per-topic monthly summaries")
+    parser.add_argument("--horizon-days", type=int, default=ARCHIVE_HORIZON_DAYS)
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = compact_answers(db, args.horizon_days, args.archive_dir, args.batch_size)
+    finally:
+        db.close()
+    print(f"Archived {result['answers']} answers into {result['summaries']} summary rows "
+          f"({len(result['files'])} files in {args.archive_dir})")
@@ -0,0 +1,178 @@
+import threading
+import unicodedata
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+
+from .dedup import canonical_text
+from .models import Question, Topic
+
+# Ids below the watermark that are re-checked on refresh. Ids are allocated
+# before commit, so a concurrent upload can commit rows below the highest
+# id already indexed.
+REFRESH_OVERLAP = 10000
+
+def tokenize(text: str) -> list:
+    """
+    Words in any script: runs of letters, digits and combining marks. Marks
+    are included because `\\w` splits scripts like Devanagari at vowel signs.
+    """
+    chars = (c if unicodedata.category(c)[0] in "LNM" else " " for c in canonical_text(text))
+    return [w for w in "".join(chars).split() if len(w) > 1]
+
+class TopicClassifier:
+    """
+    Local TF-IDF / k-nearest-neighbour topic classifier.
+
+    The index is built from the stored `Question` rows and refreshed
+    incrementally: only questions newer than the last indexed id are
+    tokenized, and the sparse matrix is re-assembled from the cached counts.
+    Prediction is a batched sparse matrix product (cosine similarity)
+    followed by a similarity-weighted vote among the top `k` neighbours.
+    """
+
+    def __init__(self, k: int = 5, min_similarity: float = 0.1, batch_size: int = 1000):
+        self.k = k
+        self.min_similarity = min_similarity
+        self.batch_size = batch_size
+        self.vocab = {}
+        self.last_question_id = 0
+        self._indexed_ids = set()
+        self._doc_freq = []
+        self._rows, self._cols, self._counts = [], [], []
+        self._topic_ids, self._subject_ids = [], []
+        self._n_docs = 0
+        self._matrix = None
+        self._idf = None
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------
+    # Index maintenance
+    # ---------------------------------------------------------
+    def add_documents(self, documents):
+        """
+        Adds (question_id, content, topic_id, subject_id) tuples to the index.
+        Questions that are already indexed are skipped.
+        """
+        rows, cols, counts = [], [], []
+        for question_id, content, topic_id, subject_id in documents:
+            if question_id in self._indexed_ids:
+                continue
+            self._indexed_ids.add(question_id)
+            for term, count in Counter(tokenize(content)).items():
+                col = self.vocab.get(term)
+                if col is None:
+                    col = self.vocab[term] = len(self.vocab)
+                    self._doc_freq.append(0)
+                self._doc_freq[col] += 1
+                rows.append(self._n_docs)
+                cols.append(col)
+                counts.append(count)
+            self._topic_ids.append(topic_id)
+            self._subject_ids.append(subject_id)
+            self._n_docs += 1
+            self.last_question_id = max(self.last_question_id, question_id)
+
+        if rows:
+            self._rows.append(np.asarray(rows, dtype=np.int64))
+            self._cols.append(np.asarray(cols, dtype=np.int64))
+            self._counts.append(np.asarray(counts, dtype=np.float64))
+        self._rebuild()
+
+    def refresh(self, db: Session):
+        """
+        Indexes questions added since the last refresh, including late commits
+        up to REFRESH_OVERLAP ids below the highest indexed id.
+        """
+        with self._lock:
+            recent_ids = db.query(Question.id).join(Topic).filter(
+                Question.id > self.last_question_id - REFRESH_OVERLAP
+            )
+            missing = [q_id for (q_id,) in recent_ids if q_id not in self._indexed_ids]
+            if not missing:
+                return
+            new_rows = db.query(
+                Question.id, Question.content, Question.topic_id, Topic.subject_id
+            ).join(Topic).filter(Question.id >= min(missing)).order_by(Question.id).all()
+            self.add_documents(new_rows)
+
+    def _rebuild(self):
+        n_terms = len(self.vocab)
+        if self._n_docs == 0 or n_terms == 0:
+            self._matrix = None
+            return
+        # Smoothed IDF, as in the usual TF-IDF formulation
+        doc_freq = np.asarray(self._doc_freq, dtype=np.float64)
+        self._idf = np.log((1 + self._n_docs) / (1 + doc_freq)) + 1
+        tf = sparse.csr_matrix(
+            (np.concatenate(self._counts), (np.concatenate(self._rows), np.concatenate(self._cols))),
+            shape=(self._n_docs, n_terms),
+        )
+        # Stored transposed so that queries are a single (n x V) @ (V x N) product
+        self._matrix = self._normalize(tf.multiply(self._idf).tocsr()).T.tocsr()
+        self._topic_array = np.asarray(self._topic_ids)
+        self._subject_array = np.asarray(self._subject_ids)
+
+    @staticmethod
+    def _normalize(matrix):
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags(1.0 / norms) @ matrix
+
+    def _vectorize(self, texts):
+        rows, cols, counts = [], [], []
+        for i, text in enumerate(texts):
+            for term, count in Counter(tokenize(text)).items():
+                col = self.vocab.get(term)
+                if col is not None:
+                    rows.append(i)
+                    cols.append(col)
+                    counts.append(count)
+        tf = sparse.csr_matrix((counts, (rows, cols)), shape=(len(texts), len(self.vocab)), dtype=np.float64)
+        return self._normalize(tf.multiply(self._idf).tocsr()).tocsr()
+
+    # ---------------------------------------------------------
+    # Prediction
+    # ---------------------------------------------------------
+    def predict(self, texts, subject_ids=None):
+        """
+        Returns a topic_id per text (None if no neighbour is similar enough).
+        If `subject_ids` is given, neighbours are restricted to that subject.
+        """
+        with self._lock:
+            return self._predict(texts, subject_ids)
+
+    def _predict(self, texts, subject_ids):
+        if self._matrix is None:
+            return [None] * len(texts)
+
+        predictions = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            similarities = (self._vectorize(batch) @ self._matrix).tocsr()
+            for i in range(len(batch)):
+                lo, hi = similarities.indptr[i], similarities.indptr[i + 1]
+                docs, scores = similarities.indices[lo:hi], similarities.data[lo:hi]
+                if subject_ids is not None:
+                    mask = self._subject_array[docs] == subject_ids[start + i]
+                    docs, scores = docs[mask], scores[mask]
+                predictions.append(self._vote(docs, scores))
+        return predictions
+
+    def _vote(self, docs, scores):
+        keep = scores >= self.min_similarity
+        docs, scores = docs[keep], scores[keep]
+        if len(docs) == 0:
+            return None
+        if len(docs) > self.k:
+            top = np.argpartition(-scores, self.k)[:self.k]
+            docs, scores = docs[top], scores[top]
+        votes = {}
+        for topic_id, score in zip(self._topic_array[docs], scores):
+            votes[topic_id] = votes.get(topic_id, 0.0) + score
+        return int(max(votes, key=votes.get))
+
+# Shared index used by the API; refreshed incrementally on demand
+topic_classifier = TopicClassifier()
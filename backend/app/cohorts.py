@@ -0,0 +1,282 @@
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import Integer, cast, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .analytics import mastery_from_counts
+from .models import (
+    Cohort, CohortTopicStats, CohortTopicHistogram, StudentTopicStats,
+    Question, Topic, Subject, cohort_members,
+    AnswerSummary, StudentAnswer, TestResult,
+)
+
+# Mastery histogram resolution: 10 buckets of width 0.1
+HISTOGRAM_BUCKETS = 10
+
+def bucket_for(mastery: float) -> int:
+    return min(int(mastery * HISTOGRAM_BUCKETS), HISTOGRAM_BUCKETS - 1)
+
+# ---------------------------------------------------------
+# Incremental maintenance
+# ---------------------------------------------------------
+
+def record_answers(db: Session, student_id: int, answers):
+    """
+    Folds one submission into the student's per-topic counts and the
+    rollups of every cohort the student belongs to.
+    `answers` is an iterable of (question_id, is_correct). Does not commit.
+    """
+    answers = list(answers)
+    question_ids = {question_id for question_id, _ in answers}
+    if not question_ids:
+        return
+    topic_of = dict(db.query(Question.id, Question.topic_id).filter(Question.id.in_(question_ids)))
+
+    # Aggregate the submission per topic first: one row update per topic
+    counts = {}
+    for question_id, is_correct in answers:
+        topic_id = topic_of.get(question_id)
+        if topic_id is None:
+            continue
+        correct, attempts = counts.get(topic_id, (0, 0))
+        counts[topic_id] = (correct + int(bool(is_correct)), attempts + 1)
+    if not counts:
+        return
+
+    _ensure_student_rows(db, student_id, counts)
+    # Row locks serialize concurrent submissions of the same student, so the
+    # old mastery that drives the histogram deltas is the committed one
+    locked = db.query(StudentTopicStats).filter(
+        StudentTopicStats.student_id == student_id,
+        StudentTopicStats.topic_id.in_(counts),
+    ).with_for_update().populate_existing()
+    changes = []
+    for stats in locked:
+        correct, attempts = counts[stats.topic_id]
+        old = mastery_from_counts(stats.correct, stats.attempts) if stats.attempts else None
+        new = mastery_from_counts(stats.correct + correct, stats.attempts + attempts)
+        stats.correct = StudentTopicStats.correct + correct
+        stats.attempts = StudentTopicStats.attempts + attempts
+        changes.append((stats.topic_id, old, new))
+
+    cohort_ids = [c_id for (c_id,) in db.query(cohort_members.c.cohort_id).filter(
+        cohort_members.c.student_id == student_id
+    )]
+    _apply_changes(db, cohort_ids, changes)
+
+def _ensure_student_rows(db: Session, student_id: int, topic_ids):
+    """
+    Creates empty (0/0) stats rows for topics the student has not attempted yet.
+    A row created concurrently by another submission is left as it is.
+    """
+    existing = {t_id for (t_id,) in db.query(StudentTopicStats.topic_id).filter(
+        StudentTopicStats.student_id == student_id,
+        StudentTopicStats.topic_id.in_(topic_ids),
+    )}
+    for topic_id in set(topic_ids) - existing:
+        try:
+            with db.begin_nested():
+                db.add(StudentTopicStats(student_id=student_id, topic_id=topic_id, correct=0, attempts=0))
+        except IntegrityError:
+            pass
+
+def add_member(db: Session, cohort: Cohort, student_id: int) -> bool:
+    """
+    Adds a student to a cohort and back-fills their existing per-topic
+    mastery into the cohort rollups. Returns False if already a member.
+    Does not commit.
+    """
+    is_member = db.query(cohort_members).filter(
+        cohort_members.c.cohort_id == cohort.id,
+        cohort_members.c.student_id == student_id,
+    ).first()
+    if is_member:
+        return False
+
+    db.execute(cohort_members.insert().values(cohort_id=cohort.id, student_id=student_id))
+    cohort.member_count = Cohort.member_count + 1
+    changes = [
+        (s.topic_id, None, mastery_from_counts(s.correct, s.attempts))
+        for s in db.query(StudentTopicStats).filter(
+            StudentTopicStats.student_id == student_id, StudentTopicStats.attempts > 0
+        )
+    ]
+    _apply_changes(db, [cohort.id], changes)
+    return True
+
+def rebuild_rollups(db: Session) -> int:
+    """
+    Recomputes every student's per-topic counts from the stored answers
+    (raw and archived) with one GROUP BY, then every cohort's rollups from
+    those counts. One-off backfill for answers recorded before the rollups
+    existed; run while submissions are paused. Does not commit.
+    Returns the number of (student, topic) rows.
+    """
+    raw = db.query(
+        TestResult.student_id.label("student_id"),
+        Question.topic_id.label("topic_id"),
+        func.sum(cast(StudentAnswer.is_correct, Integer)).label("correct"),
+        func.count(StudentAnswer.id).label("attempts"),
+    ).join(TestResult, StudentAnswer.test_result_id == TestResult.id).join(
+        Question, StudentAnswer.question_id == Question.id
+    ).filter(Question.topic_id.isnot(None)).group_by(TestResult.student_id, Question.topic_id)
+    archived = db.query(
+        AnswerSummary.student_id,
+        AnswerSummary.topic_id,
+        func.sum(AnswerSummary.correct),
+        func.sum(AnswerSummary.attempts),
+    ).filter(AnswerSummary.topic_id.isnot(None)).group_by(AnswerSummary.student_id, AnswerSummary.topic_id)
+
+    totals = {}
+    for student_id, topic_id, correct, attempts in raw.union_all(archived):
+        prev_correct, prev_attempts = totals.get((student_id, topic_id), (0, 0))
+        totals[(student_id, topic_id)] = (prev_correct + (correct or 0), prev_attempts + attempts)
+    rows = [
+        {"student_id": student_id, "topic_id": topic_id, "correct": correct, "attempts": attempts}
+        for (student_id, topic_id), (correct, attempts) in totals.items()
+    ]
+
+    for table in (CohortTopicHistogram, CohortTopicStats, StudentTopicStats):
+        db.query(table).delete(synchronize_session=False)
+    db.bulk_insert_mappings(StudentTopicStats, rows)
+
+    mastery = {}
+    for row in rows:
+        mastery.setdefault(row["student_id"], []).append(
+            (row["topic_id"], None, mastery_from_counts(row["correct"], row["attempts"]))
+        )
+    members = {}
+    for cohort_id, student_id in db.query(cohort_members.c.cohort_id, cohort_members.c.student_id):
+        members.setdefault(cohort_id, []).extend(mastery.get(student_id, []))
+    for cohort_id, changes in members.items():
+        _apply_changes(db, [cohort_id], changes)
+    return len(rows)
+
+def _apply_changes(db: Session, cohort_ids, changes):
+    """
+    Applies (topic_id, old_mastery, new_mastery) changes to the cohort rollups.
+    `old_mastery` is None when the student had not attempted the topic before.
+    Missing rows are created empty first (see `_rollup_rows`), then every row
+    is updated with `col = col + delta` so concurrent submissions from other
+    members do not overwrite each other.
+    """
+    if not cohort_ids or not changes:
+        return
+
+    stat_deltas = {}
+    hist_deltas = Counter()
+    for cohort_id in cohort_ids:
+        for topic_id, old, new in changes:
+            d_students, d_sum = stat_deltas.get((cohort_id, topic_id), (0, 0.0))
+            stat_deltas[(cohort_id, topic_id)] = (
+                d_students + (1 if old is None else 0),
+                d_sum + new - (old or 0.0),
+            )
+            if old is not None:
+                hist_deltas[(cohort_id, topic_id, bucket_for(old))] -= 1
+            hist_deltas[(cohort_id, topic_id, bucket_for(new))] += 1
+
+    topic_ids = {topic_id for topic_id, _, _ in changes}
+    stats = _rollup_rows(db, CohortTopicStats, ("cohort_id", "topic_id"), cohort_ids, topic_ids, stat_deltas,
+                         students=0, mastery_sum=0.0)
+    for key, (d_students, d_sum) in stat_deltas.items():
+        row = stats[key]
+        row.students = CohortTopicStats.students + d_students
+        row.mastery_sum = CohortTopicStats.mastery_sum + d_sum
+
+    hist_deltas = {key: delta for key, delta in hist_deltas.items() if delta != 0}
+    buckets = _rollup_rows(db, CohortTopicHistogram, ("cohort_id", "topic_id", "bucket"), cohort_ids, topic_ids,
+                           hist_deltas, students=0)
+    for key, delta in hist_deltas.items():
+        buckets[key].students = CohortTopicHistogram.students + delta
+
+def _rollup_rows(db: Session, model, key_columns, cohort_ids, topic_ids, keys, **empty):
+    """
+    Loads the rollup rows for `keys`, first creating missing ones with the
+    `empty` values, each in a savepoint. A row created concurrently by another
+    submission is left as it is, so callers always increment.
+    """
+    def load():
+        return {
+            tuple(getattr(row, c) for c in key_columns): row
+            for row in db.query(model).filter(model.cohort_id.in_(cohort_ids), model.topic_id.in_(topic_ids))
+        }
+
+    rows = load()
+    missing = [key for key in keys if key not in rows]
+    for key in missing:
+        try:
+            with db.begin_nested():
+                db.add(model(**dict(zip(key_columns, key)), **empty))
+        except IntegrityError:
+            pass
+    return load() if missing else rows
+
+# ---------------------------------------------------------
+# Queries (read only the rollups; cost is independent of cohort size)
+# ---------------------------------------------------------
+
+def topic_summary(db: Session, cohort: Cohort, limit: Optional[int] = None):
+    """
+    Per-topic mastery for a cohort, weakest (lowest avg_mastery) first.
+
+    - avg_mastery: mean over members who attempted the topic
+    - cohort_mastery: mean over all members (no attempts counts as 0)
+    - coverage: share of members who attempted the topic
+    """
+    query = db.query(
+        CohortTopicStats.topic_id,
+        Topic.name,
+        Subject.name,
+        CohortTopicStats.students,
+        CohortTopicStats.mastery_sum,
+    ).join(Topic, Topic.id == CohortTopicStats.topic_id).join(Subject).filter(
+        CohortTopicStats.cohort_id == cohort.id,
+        CohortTopicStats.students > 0,
+    ).order_by((CohortTopicStats.mastery_sum / CohortTopicStats.students).asc(), CohortTopicStats.topic_id)
+    if limit is not None:
+        query = query.limit(limit)
+
+    members = max(cohort.member_count or 0, 1)
+    return [
+        {
+            "topic_id": topic_id,
+            "topic_name": topic_name,
+            "subject": subject,
+            "students_attempted": students,
+            "avg_mastery": mastery_sum / students,
+            "cohort_mastery": mastery_sum / members,
+            "coverage": students / members,
+        }
+        for topic_id, topic_name, subject, students, mastery_sum in query
+    ]
+
+def mastery_histogram(db: Session, cohort: Cohort, topic_id: int) -> dict:
+    """
+    Number of members per mastery bucket for one topic.
+    """
+    buckets = [0] * HISTOGRAM_BUCKETS
+    rows = db.query(CohortTopicHistogram.bucket, CohortTopicHistogram.students).filter(
+        CohortTopicHistogram.cohort_id == cohort.id,
+        CohortTopicHistogram.topic_id == topic_id,
+    )
+    for bucket, students in rows:
+        buckets[bucket] = students
+    return {
+        "topic_id": topic_id,
+        "buckets": buckets,
+        "not_attempted": (cohort.member_count or 0) - sum(buckets),
+    }
+
+if __name__ == "__main__":
+    from .database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rebuilt = rebuild_rollups(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Rebuilt cohort rollups from {rebuilt} (student, topic) rows")
@@ -1,20 +1,162 @@
-from sqlalchemy import create_engine
+from sqlalchemy import UniqueConstraint, create_engine, inspect, text
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.orm import sessionmaker
+import itertools
+import threading
+import time
 import os
 
 # Use PostgreSQL if DATABASE_URL is set, otherwise fallback to local SQLite for development
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./study_engine.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in SQLALCHEMY_DATABASE_URL else {}
-)
+# Optional read replicas (comma-separated URLs) for analytics/reporting reads.
+# Writes always go to DATABASE_URL.
+REPLICA_DATABASE_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+
+# Seconds a failed replica is skipped before it is tried again
+REPLICA_RETRY_SECONDS = float(os.getenv("DATABASE_REPLICA_RETRY_SECONDS", "30"))
+
+# Create missing tables when the API starts. Set to 0 when the schema is
+# managed as a separate deploy step (`python -m app.database`).
+AUTO_CREATE_TABLES = os.getenv("AUTO_CREATE_TABLES", "1") != "0"
+
+def make_engine(url: str, **kwargs):
+    return create_engine(
+        url,
+        connect_args={"check_same_thread": False} if "sqlite" in url else {},
+        **kwargs
+    )
+
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+class ReadRouter:
+    """
+    Picks a connection for read-only work.
+    Replicas are used round-robin; a replica that fails to connect is skipped
+    for `retry_after` seconds and the next one is tried. If no replica is
+    available, the primary is used.
+    """
+
+    def __init__(self, replicas, primary, retry_after: float = REPLICA_RETRY_SECONDS):
+        self.replicas = list(replicas)
+        self.primary = primary
+        self.retry_after = retry_after
+        self._counter = itertools.count()
+        self._down_until = {}
+        self._lock = threading.Lock()
+
+    def _is_available(self, replica, now):
+        with self._lock:
+            return self._down_until.get(replica, 0) <= now
+
+    def _mark_down(self, replica, now):
+        with self._lock:
+            self._down_until[replica] = now + self.retry_after
+
+    def connect(self):
+        if self.replicas:
+            start = next(self._counter)
+            now = time.monotonic()
+            for offset in range(len(self.replicas)):
+                replica = self.replicas[(start + offset) % len(self.replicas)]
+                if not self._is_available(replica, now):
+                    continue
+                try:
+                    return replica.connect()
+                except Exception:
+                    self._mark_down(replica, now)
+        return self.primary.connect()
+
+# pool_pre_ping so a replica that went away is detected on checkout, not mid-query
+replica_engines = [make_engine(url, pool_pre_ping=True) for url in REPLICA_DATABASE_URLS]
+read_router = ReadRouter(replica_engines, engine)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def get_read_db():
+    """
+    Session for read-only endpoints, bound to a replica when configured.
+    Replicas may lag behind the primary.
+    """
+    connection = read_router.connect()
+    db = SessionLocal(bind=connection)
+    try:
+        yield db
+    finally:
+        db.close()
+        connection.close()
+
+def _migrate_table(conn, table):
+    """
+    Brings an existing table up to its model: adds missing (nullable) columns,
+    rebuilds indexes whose uniqueness changed, creates missing indexes, and
+    adds missing unique constraints as unique indexes (SQLite cannot add
+    constraints to an existing table).
+    """
+    preparer = conn.dialect.identifier_preparer
+    inspector = inspect(conn)
+    columns = {c["name"] for c in inspector.get_columns(table.name)}
+    for column in table.columns:
+        if column.name in columns:
+            continue
+        if not column.nullable and column.server_default is None:
+            raise RuntimeError(
+                f"Cannot add NOT NULL column {table.name}.{column.name} to existing rows; migrate it by hand"
+            )
+        spec = str(CreateColumn(column).compile(dialect=conn.dialect))
+        references = "".join(
+            f" REFERENCES {preparer.format_table(fk.column.table)} ({preparer.quote(fk.column.name)})"
+            for fk in column.foreign_keys
+        )
+        conn.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {spec}{references}"))
+
+    indexes = {ix["name"]: ix for ix in inspector.get_indexes(table.name)}
+    for index in table.indexes:
+        # e.g. the old global UNIQUE index on subjects.name, now unique per exam
+        if index.name in indexes and bool(indexes[index.name]["unique"]) != bool(index.unique):
+            index.drop(bind=conn)
+    for index in table.indexes:
+        index.create(bind=conn, checkfirst=True)
+
+    unique_sets = {frozenset(uc["column_names"]) for uc in inspector.get_unique_constraints(table.name)}
+    unique_sets |= {frozenset(ix["column_names"]) for ix in inspect(conn).get_indexes(table.name) if ix["unique"]}
+    for constraint in table.constraints:
+        if not isinstance(constraint, UniqueConstraint) or frozenset(constraint.columns.keys()) in unique_sets:
+            continue
+        name = "uq_" + "_".join([table.name, *constraint.columns.keys()])
+        conn.execute(text(
+            f"CREATE UNIQUE INDEX {preparer.quote(name)} ON {preparer.format_table(table)} "
+            f"({', '.join(preparer.quote(c) for c in constraint.columns.keys())})"
+        ))
+
+def init_schema(bind=None):
+    """
+    Creates missing tables and migrates existing ones to the models (see
+    `_migrate_table`), then backfills derived columns on rows stored before
+    those columns existed. Dropped or retyped columns are not handled.
+    """
+    from . import models, dedup
+    bind = bind or engine
+    with bind.begin() as conn:
+        existing = set(inspect(conn).get_table_names())
+        models.Base.metadata.create_all(bind=conn)
+        for table in models.Base.metadata.sorted_tables:
+            if table.name in existing:
+                _migrate_table(conn, table)
+
+    db = SessionLocal(bind=bind)
+    try:
+        dedup.backfill_content_hashes(db)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    init_schema()
+    print(f"Schema is up to date on {engine.url.render_as_string(hide_password=True)}")
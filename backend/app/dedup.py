@@ -0,0 +1,133 @@
+import re
+import zlib
+import hashlib
+import unicodedata
+import numpy as np
+from sqlalchemy.orm import Session
+
+from .models import Question
+
+# ---------------------------------------------------------
+# Exact duplicates: content hash
+# ---------------------------------------------------------
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+_WHITESPACE = re.compile(r"\s+")
+
+# Marks hashes computed with the current `canonical_text`; older ones are recomputed
+CONTENT_HASH_PREFIX = "v2:"
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercases, strips punctuation and collapses whitespace. Aggressive (drops
+    operators and non-ASCII text), so only used for near-duplicate shingles.
+    """
+    return _NON_ALNUM.sub(" ", (text or "").lower()).strip()
+
+def canonical_text(text: str) -> str:
+    """
+    Conservative normalization for exact duplicates: NFKC, casefold and
+    collapsed whitespace. Operators, symbols and every script are kept, so
+    "x^2 - 1" and "x^2 + 1" stay distinct.
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text or "").casefold()).strip()
+
+def content_hash(content: str, year: int, topic_id: int) -> str:
+    """
+    Identity of a question for de-duplication: canonical text + year + topic.
+    """
+    key = f"{canonical_text(content)}|{year}|{topic_id}"
+    return CONTENT_HASH_PREFIX + hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+def backfill_content_hashes(db: Session, batch_size: int = 1000) -> int:
+    """
+    Sets `content_hash` on questions stored before it existed or hashed with
+    an older normalization, so re-uploads of older papers are recognised.
+    Commits per batch; returns the rows updated.
+    """
+    updated = 0
+    while True:
+        rows = db.query(Question.id, Question.content, Question.year, Question.topic_id).filter(
+            Question.content_hash.is_(None) | ~Question.content_hash.startswith(CONTENT_HASH_PREFIX)
+        ).order_by(Question.id).limit(batch_size).all()
+        if not rows:
+            return updated
+        db.bulk_update_mappings(Question, [
+            {"id": row.id, "content_hash": content_hash(row.content, row.year, row.topic_id)} for row in rows
+        ])
+        db.commit()
+        updated += len(rows)
+
+# ---------------------------------------------------------
+# Near duplicates: MinHash + LSH banding
+# ---------------------------------------------------------
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+def shingles(text: str, size: int = 3) -> set:
+    """
+    Word n-gram shingles of the normalized text.
+    Short texts (fewer than `size` words) become a single shingle.
+    """
+    words = normalize_text(text).split()
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+class NearDuplicateIndex:
+    """
+    In-memory MinHash/LSH index used to flag reprinted questions.
+
+    Each document is reduced to a `num_perm` MinHash signature; the signature
+    is split into `bands` buckets so only documents sharing at least one band
+    are compared. Candidates are confirmed by the estimated Jaccard similarity.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.8, seed: int = 1):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._buckets = {}
+        self._signatures = {}
+
+    def signature(self, text: str) -> np.ndarray:
+        tokens = shingles(text)
+        if not tokens:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        hv = np.fromiter((zlib.crc32(t.encode("utf-8")) for t in tokens), dtype=np.uint64, count=len(tokens))
+        # Universal hashing (a*x + b) mod p, evaluated for all permutations at once
+        phv = ((self._a[:, None] * hv[None, :] + self._b[:, None]) % _MERSENNE_PRIME) & _MAX_HASH
+        return phv.min(axis=1)
+
+    def _band_keys(self, sig: np.ndarray):
+        for band in range(self.bands):
+            yield band, sig[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, key, text: str, sig: np.ndarray = None):
+        sig = self.signature(text) if sig is None else sig
+        self._signatures[key] = sig
+        for band_key in self._band_keys(sig):
+            self._buckets.setdefault(band_key, []).append(key)
+
+    def query(self, text: str, sig: np.ndarray = None):
+        """
+        Returns the best (key, similarity) match above the threshold, or None.
+        """
+        sig = self.signature(text) if sig is None else sig
+        candidates = set()
+        for band_key in self._band_keys(sig):
+            candidates.update(self._buckets.get(band_key, ()))
+
+        best = None
+        for key in candidates:
+            similarity = float(np.mean(self._signatures[key] == sig))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
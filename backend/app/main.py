@@ -1,14 +1,97 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Response, Query, Header
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+import hashlib
+import importlib
+import json
+import os
+import threading
+import time
 
-from . import models, schemas, database, analytics
+from . import models, schemas, database
 
-# Create tables
-models.Base.metadata.create_all(bind=database.engine)
+class LazyModule:
+    """Stands in for an `app` submodule and imports it on first attribute access."""
 
-app = FastAPI(title="Study Priority Engine", version="1.0")
+    def __init__(self, name: str):
+        self.name = name
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            self._module = importlib.import_module(f"{__package__}.{self.name}")
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+# The analytics engine (numpy/pandas/scipy) is only imported when first used, so
+# the server starts listening before it is loaded. The warm-up thread preloads it
+# in the background; set PRELOAD_ANALYTICS=0 to load it on first use instead.
+analytics = LazyModule("analytics")
+serialization = LazyModule("serialization")
+classifier = LazyModule("classifier")
+cohorts = LazyModule("cohorts")
+scheduler = LazyModule("scheduler")
+simulation = LazyModule("simulation")
+dedup = LazyModule("dedup")
+weights = LazyModule("weights")
+LAZY_MODULES = (analytics, serialization, classifier, cohorts, scheduler, simulation, dedup, weights)
+PRELOAD_ANALYTICS = os.getenv("PRELOAD_ANALYTICS", "1") != "0"
+
+# Backoff between schema attempts while the database is unreachable at startup
+WARM_UP_RETRY_SECONDS = float(os.getenv("WARM_UP_RETRY_SECONDS", "1"))
+WARM_UP_RETRY_MAX_SECONDS = 30.0
+
+class StartupState:
+    """Progress of the background warm-up, reported by /health/ready."""
+
+    def __init__(self):
+        self.schema_ready = threading.Event()
+        self.engine_ready = threading.Event()
+        self.error = None   # Last failure, cleared once the step succeeds
+        self.fatal = False  # Set when retrying cannot help; liveness then fails
+
+startup = StartupState()
+
+def warm_up(state: StartupState):
+    """
+    Checks the schema, retrying with backoff until the database accepts it,
+    then preloads the analytics engine. A failed preload is not retried.
+    """
+    delay = WARM_UP_RETRY_SECONDS
+    while database.AUTO_CREATE_TABLES:
+        try:
+            database.init_schema()
+            break
+        except Exception as exc:
+            state.error = repr(exc)
+            time.sleep(delay)
+            delay = min(delay * 2, WARM_UP_RETRY_MAX_SECONDS)
+    state.error = None
+    state.schema_ready.set()
+    try:
+        if PRELOAD_ANALYTICS:
+            for module in LAZY_MODULES:
+                module.load()
+    except Exception as exc:
+        state.error = repr(exc)
+        state.fatal = True
+        raise
+    state.engine_ready.set()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    threading.Thread(target=warm_up, args=(startup,), name="warm-up", daemon=True).start()
+    yield
+
+app = FastAPI(title="Study Priority Engine", version="1.0", lifespan=lifespan)
 
 # Add CORS middleware to allow frontend connections
 app.add_middleware(
@@ -27,85 +110,507 @@ def get_db():
     finally:
         db.close()
 
+# Read-only dependency: routed to a replica when DATABASE_REPLICA_URLS is set
+get_read_db = database.get_read_db
+
 @app.get("/")
 def read_root():
     return {"message": "Study Priority Engine API is running"}
 
+@app.get("/health/live")
+def liveness(response: Response):
+    """
+    The process is up and serving, unless the warm-up failed in a way that only
+    a restart can fix. Does not touch the database.
+    """
+    if startup.fatal:
+        response.status_code = 503
+        return {"status": "failed", "error": startup.error}
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+def readiness(response: Response):
+    """
+    Ready for traffic once the schema check and analytics preload have finished
+    and the database answers; 503 until then.
+    """
+    checks = {
+        "schema": startup.schema_ready.is_set(),
+        "analytics": startup.engine_ready.is_set(),
+        "database": _database_reachable(),
+    }
+    ready = all(checks.values())
+    if not ready:
+        response.status_code = 503
+    result = {"status": "ready" if ready else "starting", "checks": checks}
+    if startup.error is not None:
+        result["error"] = startup.error
+    if startup.fatal:
+        result["status"] = "failed"
+    return result
+
+def _database_reachable() -> bool:
+    try:
+        with database.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return True
+    except Exception:
+        return False
+
+@app.post("/exams", response_model=schemas.Exam)
+def create_exam(payload: schemas.ExamCreate, db: Session = Depends(get_db)):
+    """
+    Creates an exam catalog that questions can be uploaded into.
+    """
+    if db.query(models.Exam).filter(models.Exam.name == payload.name).first():
+        raise HTTPException(status_code=409, detail="Exam already exists")
+    exam = models.Exam(name=payload.name)
+    db.add(exam)
+    db.commit()
+    db.refresh(exam)
+    return exam
+
+@app.get("/exams", response_model=List[schemas.Exam])
+def list_exams(db: Session = Depends(get_read_db)):
+    return db.query(models.Exam).order_by(models.Exam.id).all()
+
+@app.post("/students/{student_id}/exams/{exam_id}", response_model=dict)
+def enroll_student(student_id: int, exam_id: int, db: Session = Depends(get_db)):
+    """
+    Links a student to an exam catalog so their study plan is scoped to it.
+    """
+    student = db.get(models.Student, student_id)
+    exam = db.get(models.Exam, exam_id)
+    if student is None or exam is None:
+        raise HTTPException(status_code=404, detail="Student or exam not found")
+    if exam not in student.exams:
+        student.exams.append(exam)
+        db.commit()
+    return {"status": "success", "student_id": student_id, "exam_id": exam_id}
+
+# Max bound parameters per IN (...) lookup, kept below SQLite's limit
+LOOKUP_CHUNK_SIZE = 500
+
 @app.post("/upload-question-paper", response_model=dict)
-def upload_questions(payload: schemas.QuestionBulkUpload, db: Session = Depends(get_db)):
+def upload_questions(
+    payload: schemas.QuestionBulkUpload,
+    near_duplicates: bool = False,
+    auto_topic: bool = False,
+    db: Session = Depends(get_db),
+):
     """
     Accepts exam questions, year, marks, subject.
     Automatically maps them to Topics (creating Topics/Subjects if needed).
+    
+    Questions already stored (same normalized content, year and topic) are skipped,
+    as are repeats within the same upload. With `near_duplicates=true`, questions
+    that closely resemble an existing question of the same subject (e.g. reprinted
+    in another year) are flagged in the response; they are still stored.
+    
+    With `auto_topic=true`, questions uploaded without a topic are assigned one
+    by the local TF-IDF classifier trained on the existing questions of their subject.
     """
-    count = 0
-    for q_data in payload.questions:
-        # 1. Get or Create Subject
-        subject = db.query(models.Subject).filter(models.Subject.name == q_data.subject).first()
-        if not subject:
-            subject = models.Subject(name=q_data.subject)
-            db.add(subject)
-            db.commit()
-            db.refresh(subject)
-        
-        # 2. Get or Create Topic
-        topic = db.query(models.Topic).filter(
-            models.Topic.name == q_data.topic, 
-            models.Topic.subject_id == subject.id
-        ).first()
-        if not topic:
-            topic = models.Topic(name=q_data.topic, subject_id=subject.id)
-            db.add(topic)
-            db.commit()
-            db.refresh(topic)
-            
-        # 3. Create Question
-        question = models.Question(
-            content=q_data.content,
-            year=q_data.year,
-            marks=q_data.marks,
-            difficulty=q_data.difficulty,
-            topic_id=topic.id
+    questions = payload.questions
+    exam_id = payload.exam_id
+    if exam_id is not None and db.get(models.Exam, exam_id) is None:
+        raise HTTPException(status_code=404, detail="Exam not found")
+    missing = [i for i, q in enumerate(questions) if q.topic is None]
+    if missing and not auto_topic:
+        raise HTTPException(status_code=422, detail=f"Questions without a topic require auto_topic=true: {missing}")
+    
+    # 1. Get or Create Subjects (one lookup for the whole upload)
+    subject_names = {q.subject for q in questions}
+    subjects = {
+        s.name: s
+        for s in db.query(models.Subject).filter(
+            models.Subject.exam_id.is_(None) if exam_id is None else models.Subject.exam_id == exam_id,
+            models.Subject.name.in_(subject_names),
+        )
+    }
+    for name in subject_names - subjects.keys():
+        subjects[name] = models.Subject(name=name, exam_id=exam_id)
+        db.add(subjects[name])
+    db.flush()
+    
+    # 2. Get or Create Topics
+    subject_ids = [s.id for s in subjects.values()]
+    topics = {
+        (t.subject_id, t.name): t
+        for t in db.query(models.Topic).filter(models.Topic.subject_id.in_(subject_ids))
+    }
+    topic_names = [q.topic for q in questions]
+    auto_assigned = 0
+    if missing:
+        topic_names, auto_assigned = _classify_topics(db, questions, missing, subjects, topics, topic_names)
+    for q_data, topic_name in zip(questions, topic_names):
+        key = (subjects[q_data.subject].id, topic_name)
+        if key not in topics:
+            topics[key] = models.Topic(name=topic_name, subject_id=key[0])
+            db.add(topics[key])
+    db.flush()
+    
+    # 3. Exact duplicate check against the content-hash index (bulk)
+    topic_ids = [topics[(subjects[q.subject].id, name)].id for q, name in zip(questions, topic_names)]
+    hashes = [dedup.content_hash(q.content, q.year, t_id) for q, t_id in zip(questions, topic_ids)]
+    unique_hashes = list(set(hashes))
+    seen = set()
+    for i in range(0, len(unique_hashes), LOOKUP_CHUNK_SIZE):
+        chunk = unique_hashes[i:i + LOOKUP_CHUNK_SIZE]
+        seen.update(h for (h,) in db.query(models.Question.content_hash).filter(models.Question.content_hash.in_(chunk)))
+    
+    # 4. Optional near-duplicate index over existing questions of the same subjects
+    index = None
+    if near_duplicates:
+        index = dedup.NearDuplicateIndex()
+        existing = db.query(models.Question.id, models.Question.content).join(models.Topic).filter(
+            models.Topic.subject_id.in_(subject_ids)
         )
-        db.add(question)
-        count += 1
+        for q_id, content in existing:
+            index.add(("question", q_id), content)
     
+    # 5. Create Questions
+    rows = []
+    flagged = []
+    duplicates = 0
+    for idx, (q_data, t_id, h) in enumerate(zip(questions, topic_ids, hashes)):
+        if h in seen:
+            duplicates += 1
+            continue
+        seen.add(h)
+        
+        if index is not None:
+            sig = index.signature(q_data.content)
+            match = index.query(q_data.content, sig)
+            if match:
+                (kind, ref), similarity = match
+                flagged.append({
+                    "index": idx,
+                    "question_id": ref if kind == "question" else None,
+                    "upload_index": ref if kind == "upload" else None,
+                    "similarity": round(similarity, 3),
+                })
+            index.add(("upload", idx), q_data.content, sig)
+        
+        rows.append({
+            "content": q_data.content,
+            "year": q_data.year,
+            "marks": q_data.marks,
+            "difficulty": q_data.difficulty,
+            "topic_id": t_id,
+            "content_hash": h,
+            "exam_id": exam_id,
+        })
+    
+    db.bulk_insert_mappings(models.Question, rows)
     db.commit()
-    return {"status": "success", "questions_uploaded": count}
+    if rows:
+        analytics.importance_cache.invalidate(exam_id)
+    
+    result = {"status": "success", "questions_uploaded": len(rows), "duplicates_skipped": duplicates}
+    if auto_topic:
+        result["topics_auto_assigned"] = auto_assigned
+    if near_duplicates:
+        result["near_duplicates"] = flagged
+    return result
+
+def _classify_topics(db: Session, questions, missing, subjects, topics, topic_names):
+    """
+    Fills in the topic of the questions at `missing` indices using the shared classifier.
+    """
+    classifier.topic_classifier.refresh(db)
+    predicted = classifier.topic_classifier.predict(
+        [questions[i].content for i in missing],
+        subject_ids=[subjects[questions[i].subject].id for i in missing],
+    )
+    names_by_id = {t.id: name for (_, name), t in topics.items()}
+    unresolved = [i for i, topic_id in zip(missing, predicted) if topic_id not in names_by_id]
+    if unresolved:
+        db.rollback()
+        raise HTTPException(status_code=422, detail=f"Could not assign a topic to questions: {unresolved}")
+    
+    topic_names = list(topic_names)
+    for i, topic_id in zip(missing, predicted):
+        topic_names[i] = names_by_id[topic_id]
+    return topic_names, len(missing)
+
+def _submission_hash(submission: schemas.MockTestSubmission) -> str:
+    payload = json.dumps(submission.model_dump(), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+def _replay_submission(db: Session, student_id: int, key: str, request_hash: str, response: Response):
+    """
+    Answers a retried submission from the stored result, or None if the key is new.
+    """
+    stored = db.query(models.TestResult.id, models.TestResult.request_hash).filter(
+        models.TestResult.student_id == student_id,
+        models.TestResult.idempotency_key == key,
+    ).first()
+    if stored is None:
+        return None
+    if stored.request_hash != request_hash:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different submission")
+    response.headers["Idempotent-Replayed"] = "true"
+    return {"status": "success", "test_id": stored.id}
 
 @app.post("/mock-test-result", response_model=dict)
-def submit_test_result(submission: schemas.MockTestSubmission, db: Session = Depends(get_db)):
+def submit_test_result(
+    submission: schemas.MockTestSubmission,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=64),
+    db: Session = Depends(get_db),
+):
     """
     Stores student answers, correctness, and time taken.
+    
+    Clients should send an `Idempotency-Key` header: a retry with the same key
+    returns the original result without writing anything. A question may only
+    be answered once per submission, and unknown questions are rejected (422).
     """
-    # Create Test Result entry
-    test_result = models.TestResult(student_id=submission.student_id)
+    duplicates = sorted(q_id for q_id, n in Counter(a.question_id for a in submission.answers).items() if n > 1)
+    if duplicates:
+        raise HTTPException(status_code=422, detail=f"Duplicate answers for questions: {duplicates}")
+    
+    request_hash = None
+    if idempotency_key is not None:
+        request_hash = _submission_hash(submission)
+        replayed = _replay_submission(db, submission.student_id, idempotency_key, request_hash, response)
+        if replayed is not None:
+            return replayed
+    
+    question_ids = [a.question_id for a in submission.answers]
+    unknown = _unknown_questions(db, question_ids)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown questions: {unknown}")
+    
+    # Create Test Result entry (same transaction as the answers)
+    test_result = models.TestResult(
+        student_id=submission.student_id,
+        idempotency_key=idempotency_key,
+        request_hash=request_hash,
+    )
     db.add(test_result)
-    db.commit()
-    db.refresh(test_result)
-    
-    # Store Answers
-    for ans in submission.answers:
-        db_answer = models.StudentAnswer(
-            test_result_id=test_result.id,
-            question_id=ans.question_id,
-            is_correct=ans.is_correct,
-            time_taken_seconds=ans.time_taken_seconds
-        )
-        db.add(db_answer)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        if idempotency_key is not None:
+            # A concurrent retry with the same key may have won the race
+            replayed = _replay_submission(db, submission.student_id, idempotency_key, request_hash, response)
+            if replayed is not None:
+                return replayed
+        # Otherwise the only other constraint on the row is the student foreign key
+        raise HTTPException(status_code=404, detail="Student not found")
     
-    db.commit()
+    try:
+        # Store Answers
+        db.bulk_insert_mappings(models.StudentAnswer, [
+            {
+                "test_result_id": test_result.id,
+                "question_id": ans.question_id,
+                "is_correct": ans.is_correct,
+                "time_taken_seconds": ans.time_taken_seconds,
+            }
+            for ans in submission.answers
+        ])
+        
+        # Keep per-topic and cohort rollups current
+        cohorts.record_answers(
+            db, submission.student_id, ((ans.question_id, ans.is_correct) for ans in submission.answers)
+        )
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        # A question deleted since the check above; anything else is a conflicting write
+        unknown = _unknown_questions(db, question_ids)
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"Unknown questions: {unknown}")
+        raise HTTPException(status_code=409, detail="Submission conflicted with a concurrent change; retry it")
     return {"status": "success", "test_id": test_result.id}
 
+def _unknown_questions(db: Session, question_ids) -> list:
+    known = {q_id for (q_id,) in db.query(models.Question.id).filter(models.Question.id.in_(question_ids))}
+    return sorted(set(question_ids) - known)
+
+def _resolve_exam(db: Session, student_id: int, exam_id: Optional[int]) -> Optional[int]:
+    """
+    `exam_id` must be one of the student's catalogs. Without it, a student
+    enrolled in exactly one catalog gets that catalog; otherwise every topic is scored.
+    """
+    enrolled = [
+        e_id for (e_id,) in db.query(models.student_exams.c.exam_id).filter(
+            models.student_exams.c.student_id == student_id
+        )
+    ]
+    if exam_id is None and len(enrolled) == 1:
+        return enrolled[0]
+    if exam_id is not None and exam_id not in enrolled:
+        raise HTTPException(status_code=404, detail="Student is not enrolled in this exam")
+    return exam_id
+
 @app.get("/study-plan/{student_id}", response_model=schemas.StudyPlan)
-def get_study_plan(student_id: int, db: Session = Depends(get_db)):
+def get_study_plan(student_id: int, exam_id: Optional[int] = None, db: Session = Depends(get_read_db)):
     """
     Returns the synthesized priority list for a specific student.
+    The response is serialized directly from the priority DataFrame;
+    `response_model` is kept for the OpenAPI docs only.
+    
+    The plan is scoped to `exam_id` (see `_resolve_exam`).
     """
-    priorities = analytics.calculate_priorities(db, student_id)
+    exam_id = _resolve_exam(db, student_id, exam_id)
+    priorities = analytics.build_priority_frame(
+        db, student_id, exam_id, cache=analytics.importance_cache, profile=weights.get_profile(db, exam_id)
+    )
     
     from datetime import datetime
+    body = serialization.serialize_study_plan(student_id, datetime.now(), priorities, exam_id)
+    return Response(content=body, media_type="application/json")
+
+@app.get("/study-schedule/{student_id}", response_model=schemas.StudySchedule)
+def get_study_schedule(
+    student_id: int,
+    days_remaining: int = Query(30, ge=1, le=365),
+    hours_per_day: float = Query(4.0, gt=0, le=24),
+    exam_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Turns the student's priorities into a day-by-day calendar that fits
+    the remaining days and daily hours, with spaced-repetition revisions.
+    """
+    exam_id = _resolve_exam(db, student_id, exam_id)
+    priorities = analytics.build_priority_frame(
+        db, student_id, exam_id, cache=analytics.importance_cache, profile=weights.get_profile(db, exam_id)
+    )
+    effort = scheduler.estimate_topic_effort(db, exam_id)
+    schedule = scheduler.build_schedule(priorities, effort, days_remaining, hours_per_day)
     return {
         "student_id": student_id,
-        "generated_at": datetime.now(),
-        "priorities": priorities
+        "exam_id": exam_id,
+        "days_remaining": days_remaining,
+        "hours_per_day": hours_per_day,
+        **schedule,
     }
+
+@app.get("/weight-profile", response_model=schemas.WeightProfile)
+def get_weight_profile(exam_id: Optional[int] = None, db: Session = Depends(get_read_db)):
+    """
+    The importance weights and recency curve in effect for a catalog.
+    """
+    profile = weights.get_profile(db, exam_id)
+    return {"exam_id": exam_id, **asdict(profile)}
+
+@app.put("/weight-profile", response_model=schemas.WeightProfile)
+def update_weight_profile(payload: schemas.WeightProfile, db: Session = Depends(get_db)):
+    """
+    Stores the catalog's weight profile (exam_id omitted = global default).
+    Saving bumps the profile's version, so every worker uses it from its next
+    plan on (replica reads once the replica has caught up). No question data
+    is re-aggregated.
+    """
+    if payload.exam_id is not None and db.get(models.Exam, payload.exam_id) is None:
+        raise HTTPException(status_code=404, detail="Exam not found")
+    row = weights.save_profile(db, payload.exam_id, payload.model_dump(exclude={"exam_id"}))
+    return row
+
+def _scenario_weights(override: Optional[schemas.ImportanceWeights], profile):
+    """
+    A scenario's (w_freq, w_marks, w_recency); weights it leaves out come from `profile`.
+    """
+    if override is None:
+        return None
+    values = (override.freq, override.marks, override.recency)
+    return tuple(default if value is None else value for value, default in zip(values, profile.weights))
+
+@app.post("/what-if/{student_id}", response_model=schemas.WhatIfResult)
+def simulate_what_if(student_id: int, request: schemas.WhatIfRequest, db: Session = Depends(get_read_db)):
+    """
+    Evaluates hypothetical mastery levels and/or importance weights against the
+    student's plan, all scenarios in one batched pass. Nothing is stored.
+    """
+    exam_id = _resolve_exam(db, student_id, request.exam_id)
+    profile = weights.get_profile(db, exam_id)
+    topic_stats = analytics.apply_profile(analytics.cached_topic_stats(db, exam_id, analytics.importance_cache), profile)
+    
+    known = set(topic_stats["topic_name"]) if not topic_stats.empty else set()
+    unknown = sorted({name for s in request.scenarios for name in s.mastery} - known)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown topics: {unknown}")
+    
+    scenarios = [{}] + [
+        {
+            "mastery": s.mastery,
+            "weights": _scenario_weights(s.weights, profile),
+        }
+        for s in request.scenarios
+    ]
+    mastery_stats = analytics.calculate_student_mastery(db, student_id, exam_id)
+    baseline, *results = simulation.simulate_scenarios(topic_stats, mastery_stats, scenarios, profile.weights)
+    return {
+        "student_id": student_id,
+        "exam_id": exam_id,
+        "baseline": baseline,
+        "scenarios": [
+            {"name": s.name, "priorities": priorities}
+            for s, priorities in zip(request.scenarios, results)
+        ],
+    }
+
+# ---------------------------------------------------------
+# Cohort dashboards (served from pre-aggregated rollups)
+# ---------------------------------------------------------
+
+def _get_cohort(db: Session, cohort_id: int) -> models.Cohort:
+    cohort = db.get(models.Cohort, cohort_id)
+    if cohort is None:
+        raise HTTPException(status_code=404, detail="Cohort not found")
+    return cohort
+
+@app.post("/cohorts", response_model=schemas.Cohort)
+def create_cohort(payload: schemas.CohortCreate, db: Session = Depends(get_db)):
+    """
+    Creates a cohort (class or institute).
+    """
+    if db.query(models.Cohort).filter(models.Cohort.name == payload.name).first():
+        raise HTTPException(status_code=409, detail="Cohort already exists")
+    cohort = models.Cohort(name=payload.name, member_count=0)
+    db.add(cohort)
+    db.commit()
+    db.refresh(cohort)
+    return cohort
+
+@app.post("/cohorts/{cohort_id}/members/{student_id}", response_model=dict)
+def add_cohort_member(cohort_id: int, student_id: int, db: Session = Depends(get_db)):
+    """
+    Adds a student to a cohort; their existing results are folded into the rollups.
+    """
+    cohort = _get_cohort(db, cohort_id)
+    if db.get(models.Student, student_id) is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+    added = cohorts.add_member(db, cohort, student_id)
+    db.commit()
+    return {"status": "success" if added else "already_member", "cohort_id": cohort_id, "student_id": student_id}
+
+@app.get("/cohorts/{cohort_id}/topics", response_model=List[schemas.CohortTopicStats])
+def get_cohort_topics(cohort_id: int, db: Session = Depends(get_read_db)):
+    """
+    Per-topic mastery across the cohort, weakest (lowest avg_mastery) first.
+    """
+    return cohorts.topic_summary(db, _get_cohort(db, cohort_id))
+
+@app.get("/cohorts/{cohort_id}/weakest-topics", response_model=List[schemas.CohortTopicStats])
+def get_cohort_weakest_topics(
+    cohort_id: int,
+    limit: int = Query(5, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    """
+    The cohort's topics with the lowest average mastery among members who attempted them.
+    """
+    return cohorts.topic_summary(db, _get_cohort(db, cohort_id), limit=limit)
+
+@app.get("/cohorts/{cohort_id}/topics/{topic_id}/histogram", response_model=schemas.CohortHistogram)
+def get_cohort_histogram(cohort_id: int, topic_id: int, db: Session = Depends(get_read_db)):
+    """
+    Distribution of member mastery for one topic.
+    """
+    return cohorts.mastery_histogram(db, _get_cohort(db, cohort_id), topic_id)
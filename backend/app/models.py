@@ -1,14 +1,41 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, Date, DateTime, Boolean, Table, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
 
 Base = declarative_base()
 
+# Many-to-many: which exam catalogs a student is preparing for
+student_exams = Table(
+    "student_exams",
+    Base.metadata,
+    Column("student_id", Integer, ForeignKey("students.id"), primary_key=True),
+    Column("exam_id", Integer, ForeignKey("exams.id"), primary_key=True, index=True),
+)
+
+class Exam(Base):
+    """An exam catalog; subjects, topics and questions are partitioned by exam."""
+    __tablename__ = "exams"
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True)
+    
+    subjects = relationship("Subject", back_populates="exam")
+    students = relationship("Student", secondary=student_exams, back_populates="exams")
+
 class Subject(Base):
     __tablename__ = "subjects"
+    __table_args__ = (
+        UniqueConstraint("exam_id", "name"),
+        # NULLs are distinct in the constraint above, so global-catalog names need their own index
+        Index(
+            "uq_subjects_global_name", "name", unique=True,
+            sqlite_where=text("exam_id IS NULL"), postgresql_where=text("exam_id IS NULL"),
+        ),
+    )
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, unique=True, index=True)
+    name = Column(String, index=True)
+    exam_id = Column(Integer, ForeignKey("exams.id"), index=True, nullable=True)  # NULL = global catalog
     
+    exam = relationship("Exam", back_populates="subjects")
     topics = relationship("Topic", back_populates="subject")
 
 class Topic(Base):
@@ -28,6 +55,8 @@ class Question(Base):
     marks = Column(Integer)             # Weightage
     difficulty = Column(String, default="Medium") # Easy, Medium, Hard
     topic_id = Column(Integer, ForeignKey("topics.id"))
+    content_hash = Column(String, index=True)  # normalized content + year + topic (see dedup.py)
+    exam_id = Column(Integer, ForeignKey("exams.id"), index=True, nullable=True)  # Denormalized from Subject for scoped scans
     
     topic = relationship("Topic", back_populates="questions")
     answers = relationship("StudentAnswer", back_populates="question")
@@ -37,13 +66,18 @@ class Student(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
     
+    exams = relationship("Exam", secondary=student_exams, back_populates="students")
     test_results = relationship("TestResult", back_populates="student")
 
 class TestResult(Base):
     __tablename__ = "test_results"
+    # One result per (student, Idempotency-Key): retried submissions hit this index
+    __table_args__ = (UniqueConstraint("student_id", "idempotency_key"),)
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"))
-    taken_at = Column(DateTime, default=datetime.utcnow)
+    taken_at = Column(DateTime, default=datetime.utcnow, index=True)
+    idempotency_key = Column(String(64), nullable=True)
+    request_hash = Column(String(16), nullable=True)  # Fingerprint of the submitted payload
     
     student = relationship("Student", back_populates="test_results")
     answers = relationship("StudentAnswer", back_populates="test_result")
@@ -58,3 +92,78 @@ class StudentAnswer(Base):
     
     test_result = relationship("TestResult", back_populates="answers")
     question = relationship("Question", back_populates="answers")
+
+# ---------------------------------------------------------
+# Archived answers (compacted by archival.py)
+# ---------------------------------------------------------
+
+class AnswerSummary(Base):
+    """Answer counts per (student, topic, catalog, month) for answers moved out of student_answers."""
+    __tablename__ = "answer_summaries"
+    __table_args__ = (UniqueConstraint("student_id", "topic_id", "exam_id", "period_start"),)
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer, ForeignKey("students.id"), index=True)
+    topic_id = Column(Integer, ForeignKey("topics.id"))
+    exam_id = Column(Integer, ForeignKey("exams.id"), nullable=True)
+    period_start = Column(Date)                      # First day of the month the tests were taken
+    correct = Column(Integer, default=0)
+    attempts = Column(Integer, default=0)
+    time_taken_seconds = Column(Integer, default=0)  # Sum over timed attempts
+    timed_attempts = Column(Integer, default=0)
+
+# ---------------------------------------------------------
+# Cohort analytics (pre-aggregated rollups, see cohorts.py)
+# ---------------------------------------------------------
+
+cohort_members = Table(
+    "cohort_members",
+    Base.metadata,
+    Column("cohort_id", Integer, ForeignKey("cohorts.id"), primary_key=True),
+    Column("student_id", Integer, ForeignKey("students.id"), primary_key=True, index=True),
+)
+
+class Cohort(Base):
+    """A class or institute; students can belong to several cohorts."""
+    __tablename__ = "cohorts"
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True)
+    member_count = Column(Integer, default=0)
+
+class StudentTopicStats(Base):
+    """Running answer counts per (student, topic), updated on every submission."""
+    __tablename__ = "student_topic_stats"
+    student_id = Column(Integer, ForeignKey("students.id"), primary_key=True)
+    topic_id = Column(Integer, ForeignKey("topics.id"), primary_key=True)
+    correct = Column(Integer, default=0)
+    attempts = Column(Integer, default=0)
+
+class CohortTopicStats(Base):
+    """Rollup of member mastery per (cohort, topic)."""
+    __tablename__ = "cohort_topic_stats"
+    cohort_id = Column(Integer, ForeignKey("cohorts.id"), primary_key=True)
+    topic_id = Column(Integer, ForeignKey("topics.id"), primary_key=True)
+    students = Column(Integer, default=0)       # Members with at least one attempt
+    mastery_sum = Column(Float, default=0.0)    # Sum of member mastery scores
+
+class CohortTopicHistogram(Base):
+    """Number of members per mastery bucket (0.0-0.1, ..., 0.9-1.0) per (cohort, topic)."""
+    __tablename__ = "cohort_topic_histogram"
+    cohort_id = Column(Integer, ForeignKey("cohorts.id"), primary_key=True)
+    topic_id = Column(Integer, ForeignKey("topics.id"), primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    students = Column(Integer, default=0)
+
+class WeightProfile(Base):
+    """Importance weights and recency curve for a catalog (exam_id NULL = global default)."""
+    __tablename__ = "weight_profiles"
+    id = Column(Integer, primary_key=True, index=True)
+    exam_id = Column(Integer, ForeignKey("exams.id"), unique=True, nullable=True)
+    # Always written from a full profile; the defaults live in weights.py
+    w_freq = Column(Float, nullable=False)
+    w_marks = Column(Float, nullable=False)
+    w_recency = Column(Float, nullable=False)
+    recency_model = Column(String, default="hyperbolic")  # hyperbolic, exponential, windowed
+    recency_half_life = Column(Float, default=2.0)        # Years (exponential)
+    recency_window = Column(Integer, default=3)           # Years (windowed)
+    reference_year = Column(Integer, nullable=True)       # NULL = current year
+    version = Column(Integer, nullable=True)              # Bumped on every save; checked by cached readers
@@ -0,0 +1,161 @@
+import time
+import threading
+import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .models import AnswerSummary, Question, StudentAnswer
+
+# Hours to study a topic from scratch at average difficulty
+BASE_STUDY_HOURS = 2.0
+# Effort multiplier bounds derived from answer times
+MIN_EFFORT_RATIO, MAX_EFFORT_RATIO = 0.5, 3.0
+# Even well-known topics need some study time
+MIN_GAP = 0.2
+
+# Spaced repetition: revise on these days after a topic is first studied
+REVIEW_OFFSETS = (1, 3, 7, 14, 30)
+REVIEW_HOURS = 0.5
+
+# Smallest block worth scheduling, in hours
+MIN_SESSION_HOURS = 0.5
+
+# Effort estimates change slowly; cache them per catalog
+EFFORT_CACHE_SECONDS = 600
+_effort_cache = {}
+_effort_lock = threading.Lock()
+
+def estimate_topic_effort(db: Session, exam_id: Optional[int] = None) -> pd.Series:
+    """
+    Relative effort per topic (indexed by topic_id), from the average
+    `time_taken_seconds` of all answers to the topic's questions, divided by
+    the overall average. Topics without timing data are absent (ratio 1.0).
+    Archived answers count through their summaries.
+    """
+    now = time.monotonic()
+    with _effort_lock:
+        cached = _effort_cache.get(exam_id)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    raw = db.query(
+        Question.topic_id.label("topic_id"),
+        func.sum(StudentAnswer.time_taken_seconds).label("seconds"),
+        func.count(StudentAnswer.time_taken_seconds).label("timed"),
+    ).join(Question).group_by(Question.topic_id)
+    archived = db.query(
+        AnswerSummary.topic_id,
+        func.sum(AnswerSummary.time_taken_seconds),
+        func.sum(AnswerSummary.timed_attempts),
+    ).group_by(AnswerSummary.topic_id)
+    if exam_id is not None:
+        raw = raw.filter(Question.exam_id == exam_id)
+        archived = archived.filter(AnswerSummary.exam_id == exam_id)
+    totals = {}
+    for topic_id, seconds, timed in raw.union_all(archived):
+        if timed:
+            prev_seconds, prev_timed = totals.get(topic_id, (0, 0))
+            totals[topic_id] = (prev_seconds + seconds, prev_timed + timed)
+    rows = [(topic_id, seconds / timed) for topic_id, (seconds, timed) in totals.items() if seconds]
+
+    if rows:
+        topic_ids, avg_times = zip(*rows)
+        avg_times = np.asarray(avg_times, dtype=float)
+        ratios = np.clip(avg_times / avg_times.mean(), MIN_EFFORT_RATIO, MAX_EFFORT_RATIO)
+        effort = pd.Series(ratios, index=list(topic_ids))
+    else:
+        effort = pd.Series(dtype=float)
+
+    with _effort_lock:
+        _effort_cache[exam_id] = (now + EFFORT_CACHE_SECONDS, effort)
+    return effort
+
+def _round_up(hours: float) -> float:
+    return float(np.ceil(hours / MIN_SESSION_HOURS) * MIN_SESSION_HOURS)
+
+def build_schedule(
+    priorities: pd.DataFrame,
+    effort_ratio: pd.Series,
+    days_remaining: int,
+    hours_per_day: float,
+    start_date: Optional[datetime.date] = None,
+) -> dict:
+    """
+    Turns a priority frame (from `analytics.build_priority_frame`) into a
+    day-by-day calendar.
+
+    1. Effort: BASE_STUDY_HOURS * effort ratio * knowledge gap (1 - mastery).
+    2. Selection (greedy knapsack): topics are taken in order of priority per
+       hour, including the cost of their revisions, while they fit the budget.
+    3. Calendar: each day first serves due revisions, then continues the
+       highest-priority selected topic. Finishing a topic schedules revisions
+       at REVIEW_OFFSETS days later (if still before the exam).
+    """
+    start_date = start_date or datetime.date.today()
+    days = [{"day": d + 1, "date": start_date + datetime.timedelta(days=d), "sessions": []} for d in range(days_remaining)]
+    if priorities.empty or days_remaining <= 0 or hours_per_day <= 0:
+        return {"planned_hours": 0.0, "unscheduled_topics": [], "days": days}
+
+    topics = priorities[priorities["priority_score"] > 0]
+    ratio = topics["topic_id"].map(effort_ratio).fillna(1.0).to_numpy()
+    gap = np.maximum(1 - topics["mastery_score"].to_numpy(), MIN_GAP)
+    effort = np.array([_round_up(h) for h in BASE_STUDY_HOURS * ratio * gap])
+    # Only revisions that can fall before the exam count against the budget
+    n_reviews = sum(1 for offset in REVIEW_OFFSETS if offset < days_remaining)
+    cost = effort + REVIEW_HOURS * n_reviews
+
+    # Greedy knapsack on priority density
+    budget = days_remaining * hours_per_day
+    density = topics["priority_score"].to_numpy() / cost
+    selected = []
+    for i in np.argsort(-density, kind="stable"):
+        if cost[i] <= budget:
+            selected.append(i)
+            budget -= cost[i]
+    # Study order: most urgent first
+    selected.sort(key=lambda i: -topics["priority_score"].iat[i])
+    unscheduled = sorted(set(range(len(topics))) - set(selected))
+
+    names = topics["topic_name"].tolist()
+    subjects = topics["subject"].tolist()
+    remaining = {i: effort[i] for i in selected}
+    queue = list(selected)
+    reviews = {}
+    planned = 0.0
+
+    for d, day in enumerate(days):
+        capacity = hours_per_day
+        sessions = day["sessions"]
+
+        # Revisions due today; anything that does not fit moves to tomorrow
+        for i in reviews.pop(d, []):
+            if capacity >= REVIEW_HOURS:
+                sessions.append({"topic_name": names[i], "subject": subjects[i], "hours": REVIEW_HOURS, "kind": "revise"})
+                capacity -= REVIEW_HOURS
+                planned += REVIEW_HOURS
+            elif d + 1 < days_remaining:
+                reviews.setdefault(d + 1, []).append(i)
+
+        # New study, continuing the current topic across days if needed
+        while queue and capacity >= MIN_SESSION_HOURS:
+            i = queue[0]
+            hours = min(remaining[i], capacity)
+            sessions.append({"topic_name": names[i], "subject": subjects[i], "hours": hours, "kind": "study"})
+            remaining[i] -= hours
+            capacity -= hours
+            planned += hours
+            if remaining[i] <= 0:
+                queue.pop(0)
+                for offset in REVIEW_OFFSETS:
+                    if d + offset < days_remaining:
+                        reviews.setdefault(d + offset, []).append(i)
+
+    return {
+        "planned_hours": planned,
+        "unscheduled_topics": [names[i] for i in unscheduled],
+        "days": days,
+    }
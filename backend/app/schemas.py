@@ -1,20 +1,29 @@
-from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from pydantic import BaseModel, Field, confloat
+from typing import List, Optional, Dict, Literal
+from datetime import datetime, date
+
+from .weights import W_FREQ, W_MARKS, W_RECENCY
 
 # --- Input Schemas ---
 
 class QuestionCreate(BaseModel):
     subject: str
-    topic: str
+    topic: Optional[str] = None  # Required unless uploaded with auto_topic=true
     content: str
     year: int
     marks: int
     difficulty: str = "Medium"
 
 class QuestionBulkUpload(BaseModel):
+    exam_id: Optional[int] = None  # Target catalog; None = global catalog
     questions: List[QuestionCreate]
 
+class ExamCreate(BaseModel):
+    name: str
+
+class CohortCreate(BaseModel):
+    name: str
+
 class AnswerCreate(BaseModel):
     question_id: int
     is_correct: bool
@@ -24,6 +33,33 @@ class MockTestSubmission(BaseModel):
     student_id: int
     answers: List[AnswerCreate]
 
+class ImportanceWeights(BaseModel):
+    # Omitted weights are taken from the catalog's profile
+    freq: Optional[float] = Field(None, ge=0)
+    marks: Optional[float] = Field(None, ge=0)
+    recency: Optional[float] = Field(None, ge=0)
+
+class WeightProfile(BaseModel):
+    exam_id: Optional[int] = None  # None = global default profile
+    w_freq: float = Field(W_FREQ, ge=0)
+    w_marks: float = Field(W_MARKS, ge=0)
+    w_recency: float = Field(W_RECENCY, ge=0)
+    recency_model: Literal["hyperbolic", "exponential", "windowed"] = "hyperbolic"
+    recency_half_life: float = Field(2.0, gt=0)  # Years, exponential model
+    recency_window: int = Field(3, ge=1)         # Years, windowed model
+    reference_year: Optional[int] = None         # None = current year
+
+    model_config = {"from_attributes": True}
+
+class WhatIfScenario(BaseModel):
+    name: Optional[str] = None
+    mastery: Dict[str, confloat(ge=0, le=1)] = {}  # topic_name -> hypothetical mastery
+    weights: Optional[ImportanceWeights] = None
+
+class WhatIfRequest(BaseModel):
+    exam_id: Optional[int] = None
+    scenarios: List[WhatIfScenario] = Field(..., max_length=256)
+
 # --- Output Schemas ---
 
 class TopicPriority(BaseModel):
@@ -34,7 +70,65 @@ class TopicPriority(BaseModel):
     priority_score: float
     recommendation: str  # "Study Now", "Revise Later", "Deprioritize"
 
+class Exam(BaseModel):
+    id: int
+    name: str
+
+    model_config = {"from_attributes": True}
+
 class StudyPlan(BaseModel):
     student_id: int
+    exam_id: Optional[int] = None
     generated_at: datetime
     priorities: List[TopicPriority]
+
+class StudySession(BaseModel):
+    topic_name: str
+    subject: str
+    hours: float
+    kind: str  # "study" or "revise"
+
+class StudyDay(BaseModel):
+    day: int
+    date: date
+    sessions: List[StudySession]
+
+class StudySchedule(BaseModel):
+    student_id: int
+    exam_id: Optional[int] = None
+    days_remaining: int
+    hours_per_day: float
+    planned_hours: float
+    unscheduled_topics: List[str]  # Selected out by the time budget
+    days: List[StudyDay]
+
+class Cohort(BaseModel):
+    id: int
+    name: str
+    member_count: int
+
+    model_config = {"from_attributes": True}
+
+class CohortTopicStats(BaseModel):
+    topic_id: int
+    topic_name: str
+    subject: str
+    students_attempted: int
+    avg_mastery: float     # Mean over members who attempted the topic
+    cohort_mastery: float  # Mean over all members (no attempts = 0)
+    coverage: float        # Share of members who attempted the topic
+
+class CohortHistogram(BaseModel):
+    topic_id: int
+    buckets: List[int]     # Members per mastery bucket: [0.0-0.1), ..., [0.9-1.0]
+    not_attempted: int
+
+class ScenarioResult(BaseModel):
+    name: Optional[str] = None
+    priorities: List[TopicPriority]
+
+class WhatIfResult(BaseModel):
+    student_id: int
+    exam_id: Optional[int] = None
+    baseline: List[TopicPriority]
+    scenarios: List[ScenarioResult]
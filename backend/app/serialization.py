@@ -0,0 +1,55 @@
+import os
+import json
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+from . import schemas
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+# Set VALIDATE_RESPONSES=0 in production to skip Pydantic validation of the
+# serialized study plan. Validation stays on by default for development.
+VALIDATE_RESPONSES = os.getenv("VALIDATE_RESPONSES", "1").lower() not in ("0", "false", "no")
+
+# Columns exposed by the documented schema, in schema order
+PRIORITY_FIELDS = list(schemas.TopicPriority.model_fields)
+
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, default=lambda o: o.isoformat(), separators=(",", ":")).encode()
+
+
+def frame_to_records(df: pd.DataFrame, fields=PRIORITY_FIELDS) -> list:
+    """
+    Converts a priority DataFrame into a list of plain dicts.
+    Works column-wise (one `tolist()` per column) instead of row-wise,
+    and only keeps the fields declared in the response schema.
+    """
+    if df.empty:
+        return []
+    columns = [df[field].tolist() for field in fields]
+    return [dict(zip(fields, row)) for row in zip(*columns)]
+
+
+def serialize_study_plan(student_id: int, generated_at: datetime, df: pd.DataFrame, exam_id: Optional[int] = None) -> bytes:
+    """
+    Serializes a study plan straight from the priority DataFrame to JSON bytes.
+    The payload matches `schemas.StudyPlan`; validation is only performed
+    when VALIDATE_RESPONSES is enabled.
+    """
+    body = _dumps({
+        "student_id": student_id,
+        "exam_id": exam_id,
+        "generated_at": generated_at,
+        "priorities": frame_to_records(df),
+    })
+    if VALIDATE_RESPONSES:
+        schemas.StudyPlan.model_validate_json(body)
+    return body
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from .analytics import IMPORTANCE_COMPONENTS, categorize
+from .weights import DEFAULT_PROFILE
+
+def simulate_scenarios(
+    topic_stats: pd.DataFrame,
+    mastery_stats: pd.DataFrame,
+    scenarios,
+    default_weights=DEFAULT_PROFILE.weights,
+) -> list:
+    """
+    Evaluates what-if scenarios in one batched NumPy pass.
+
+    `topic_stats` is the (cached) output of `calculate_topic_importance` and
+    `mastery_stats` the student's current mastery. Each scenario is a dict with
+    optional `mastery` ({topic_name: hypothetical mastery}) and `weights`
+    ((w_freq, w_marks, w_recency), else `default_weights`).
+    Nothing is written to the database.
+
+    With S scenarios and T topics:
+      importance (S x T) = weights (S x 3) @ components (3 x T)
+      priority   (S x T) = importance * (1 - mastery)
+    and each row is ranked and categorized like the regular study plan.
+
+    Returns one list of priority dicts per scenario, highest priority first.
+    """
+    if topic_stats.empty or not scenarios:
+        return [[] for _ in scenarios]
+
+    components = topic_stats[IMPORTANCE_COMPONENTS].to_numpy(dtype=float)
+    n_topics = len(components)
+    names = topic_stats["topic_name"].to_numpy(dtype=object)
+    subjects = topic_stats["subject_name"].to_numpy(dtype=object)
+
+    base_mastery = (
+        topic_stats[["topic_id"]]
+        .merge(mastery_stats[["topic_id", "mastery_score"]], on="topic_id", how="left")["mastery_score"]
+        .fillna(0.0)
+        .to_numpy(dtype=float)
+    )
+
+    weights = np.array([s.get("weights") or default_weights for s in scenarios], dtype=float)
+    mastery = np.tile(base_mastery, (len(scenarios), 1))
+    positions = {}
+    for i, name in enumerate(names):
+        positions.setdefault(name, []).append(i)
+    for row, scenario in enumerate(scenarios):
+        for topic_name, value in (scenario.get("mastery") or {}).items():
+            # A name shared by several subjects applies to all of them
+            mastery[row, positions[topic_name]] = value
+
+    importance = weights @ components.T
+    priority = importance * (1 - mastery)
+
+    order = np.argsort(-priority, axis=1, kind="stable")
+    priority = np.take_along_axis(priority, order, axis=1)
+    importance = np.take_along_axis(importance, order, axis=1)
+    mastery = np.take_along_axis(mastery, order, axis=1)
+    rank_pct = np.arange(n_topics) / n_topics
+    categories = categorize(priority, mastery, rank_pct[None, :])
+
+    results = []
+    for row in range(len(scenarios)):
+        idx = order[row]
+        results.append([
+            {
+                "topic_name": topic_name,
+                "subject": subject,
+                "importance_score": imp,
+                "mastery_score": mas,
+                "priority_score": pri,
+                "recommendation": rec,
+            }
+            for topic_name, subject, imp, mas, pri, rec in zip(
+                names[idx].tolist(), subjects[idx].tolist(), importance[row].tolist(),
+                mastery[row].tolist(), priority[row].tolist(), categories[row].tolist(),
+            )
+        ])
+    return results
@@ -0,0 +1,128 @@
+import datetime
+import threading
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .models import WeightProfile
+
+# Weights for Importance Formula (defaults when a catalog has no profile)
+W_FREQ = 0.35
+W_MARKS = 0.45
+W_RECENCY = 0.20
+
+RECENCY_MODELS = ("hyperbolic", "exponential", "windowed")
+
+# Score for questions dated after the reference year
+FUTURE_RECENCY = 0.1
+
+@dataclass(frozen=True)
+class ImportanceProfile:
+    w_freq: float = W_FREQ
+    w_marks: float = W_MARKS
+    w_recency: float = W_RECENCY
+    recency_model: str = "hyperbolic"
+    recency_half_life: float = 2.0
+    recency_window: int = 3
+    reference_year: Optional[int] = None
+
+    @property
+    def weights(self):
+        return (self.w_freq, self.w_marks, self.w_recency)
+
+DEFAULT_PROFILE = ImportanceProfile()
+
+def recency_scores(avg_year: "np.ndarray", profile: ImportanceProfile) -> "np.ndarray":
+    """
+    Raw recency per topic from the average exam year (age gap = reference - year).
+
+    - hyperbolic:  1 / (gap + 1)
+    - exponential: 0.5 ** (gap / half_life)
+    - windowed:    1.0 within the last `window` years, else 0.0
+    """
+    # Imported here so the schemas can use this module's defaults without numpy
+    import numpy as np
+
+    year = profile.reference_year or datetime.date.today().year
+    gap = year - np.asarray(avg_year, dtype=float)
+    past = np.maximum(gap, 0)
+    if profile.recency_model == "exponential":
+        score = 0.5 ** (past / profile.recency_half_life)
+    elif profile.recency_model == "windowed":
+        score = (past < profile.recency_window).astype(float)
+    else:
+        score = 1 / (past + 1)
+    return np.where(gap >= 0, score, FUTURE_RECENCY)
+
+# ---------------------------------------------------------
+# Stored profiles
+# ---------------------------------------------------------
+
+# Profiles are cached per catalog; the TTL also rolls the current year over
+# exam_id -> (profile versions, current year, resolved profile)
+_profiles = {}
+_profiles_lock = threading.Lock()
+
+def _from_row(row: WeightProfile) -> ImportanceProfile:
+    return ImportanceProfile(
+        w_freq=row.w_freq,
+        w_marks=row.w_marks,
+        w_recency=row.w_recency,
+        recency_model=row.recency_model,
+        recency_half_life=row.recency_half_life,
+        recency_window=row.recency_window,
+        reference_year=row.reference_year,
+    )
+
+def _profile_versions(db: Session, exam_id: Optional[int]) -> frozenset:
+    """(exam_id, version) of the profiles `get_profile` may read; changes on every save."""
+    scope = WeightProfile.exam_id.is_(None)
+    if exam_id is not None:
+        scope = scope | (WeightProfile.exam_id == exam_id)
+    return frozenset(db.query(WeightProfile.exam_id, WeightProfile.version).filter(scope))
+
+def get_profile(db: Session, exam_id: Optional[int] = None) -> ImportanceProfile:
+    """
+    The catalog's profile, falling back to the global one and then to the defaults.
+    The reference year is resolved here, so scoring never reads the clock.
+
+    Cached per process until the stored versions change, so a save on another
+    worker (or a replica catching up) is picked up on the next read.
+    """
+    versions = _profile_versions(db, exam_id)
+    year = datetime.date.today().year
+    with _profiles_lock:
+        cached = _profiles.get(exam_id)
+    if cached is not None and cached[:2] == (versions, year):
+        return cached[2]
+
+    row = db.query(WeightProfile).filter(WeightProfile.exam_id == exam_id).first() if exam_id is not None else None
+    if row is None:
+        row = db.query(WeightProfile).filter(WeightProfile.exam_id.is_(None)).first()
+    profile = _from_row(row) if row is not None else DEFAULT_PROFILE
+    if profile.reference_year is None:
+        profile = replace(profile, reference_year=year)
+
+    with _profiles_lock:
+        _profiles[exam_id] = (versions, year, profile)
+    return profile
+
+def save_profile(db: Session, exam_id: Optional[int], values: dict) -> WeightProfile:
+    """
+    Creates or updates the catalog's profile and bumps its version, which
+    invalidates cached copies in every process. Commits.
+    """
+    query = db.query(WeightProfile)
+    row = query.filter(WeightProfile.exam_id.is_(None) if exam_id is None else WeightProfile.exam_id == exam_id).first()
+    if row is None:
+        row = WeightProfile(exam_id=exam_id, version=1)
+        db.add(row)
+    else:
+        row.version = func.coalesce(WeightProfile.version, 0) + 1
+    for key, value in values.items():
+        setattr(row, key, value)
+    db.commit()
+    db.refresh(row)
+    return row
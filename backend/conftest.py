@@ -0,0 +1,49 @@
+"""
+Shared fixtures for the API tests: an in-memory database per test and a
+TestClient whose database dependencies point at it.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import analytics, classifier, models, scheduler, weights
+from app.main import app, get_db, get_read_db
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine, monkeypatch):
+    # Module-level caches are keyed by ids, which restart at 1 in every in-memory database
+    monkeypatch.setattr(analytics, "importance_cache", analytics.ImportanceCache())
+    monkeypatch.setattr(classifier, "topic_classifier", classifier.TopicClassifier())
+    weights._profiles.clear()
+    scheduler._effort_cache.clear()
+    yield sessionmaker(bind=engine)
+    weights._profiles.clear()
+    scheduler._effort_cache.clear()
+
+
+@pytest.fixture
+def client(session_factory):
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_read_db, None)
@@ -0,0 +1,251 @@
+"""
+Load-Testing Harness for the Study Priority Engine API
+
+Replays a weighted mix of uploads, submissions and plan reads against a running
+API with an asyncio HTTP client, then reports throughput, latency percentiles
+and error rates per endpoint. Exits with status 1 if a threshold is exceeded.
+
+Usage (from backend/):
+    # 1. Seed a scratch database (scales with the flags)
+    DATABASE_URL=sqlite:///./loadtest.db python load_test.py seed --students 2000 --topics 200
+
+    # 2. Start the API on the same database
+    DATABASE_URL=sqlite:///./loadtest.db uvicorn app.main:app --port 8000
+
+    # 3. Replay exam-day traffic
+    python load_test.py run --profile exam_day --duration 60 --concurrency 50 \\
+        --max-p95-ms 250 --max-error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+
+import numpy as np
+
+# Relative request mix per traffic profile
+PROFILES = {
+    # Morning of the exam: everyone checks their plan, some last mock tests
+    "exam_day": {"study_plan": 60, "study_schedule": 15, "submit": 20, "upload": 5},
+    # Content team importing past papers while students keep practising
+    "ingest": {"study_plan": 30, "study_schedule": 5, "submit": 25, "upload": 40},
+    "mixed": {"study_plan": 40, "study_schedule": 10, "submit": 40, "upload": 10},
+}
+
+# ---------------------------------------------------------
+# 1. Scalable data generator
+# ---------------------------------------------------------
+
+def generate(db, students=1000, subjects=5, topics=100, questions_per_topic=20,
+             answers_per_student=50, seed=42):
+    """
+    Bulk-inserts a synthetic exam history. Row counts scale linearly with the
+    arguments; uses bulk inserts so 100k+ answers take seconds, not minutes.
+    Cohort rollups are not populated.
+    """
+    from app import models, dedup
+
+    rng = random.Random(seed)
+    db.bulk_insert_mappings(models.Subject, [{"name": f"Subject {s}"} for s in range(subjects)])
+    db.flush()
+    subject_ids = [s_id for (s_id,) in db.query(models.Subject.id).order_by(models.Subject.id)]
+
+    db.bulk_insert_mappings(models.Topic, [
+        {"name": f"Topic {t}", "subject_id": subject_ids[t % subjects]} for t in range(topics)
+    ])
+    db.flush()
+    topic_ids = [t_id for (t_id,) in db.query(models.Topic.id).order_by(models.Topic.id)]
+
+    questions = []
+    for t_id in topic_ids:
+        for q in range(questions_per_topic):
+            content = f"Generated question {q} on topic {t_id}"
+            year = rng.randint(2015, 2025)
+            questions.append({
+                "content": content, "year": year, "marks": rng.choice([1, 2, 5, 10]),
+                "difficulty": rng.choice(["Easy", "Medium", "Hard"]), "topic_id": t_id,
+                "content_hash": dedup.content_hash(content, year, t_id),
+            })
+    db.bulk_insert_mappings(models.Question, questions)
+    db.bulk_insert_mappings(models.Student, [{"name": f"Student {s}"} for s in range(students)])
+    db.flush()
+    question_ids = [q_id for (q_id,) in db.query(models.Question.id)]
+    student_ids = [s_id for (s_id,) in db.query(models.Student.id)]
+
+    db.bulk_insert_mappings(models.TestResult, [{"student_id": s_id} for s_id in student_ids])
+    db.flush()
+    result_ids = [r_id for (r_id,) in db.query(models.TestResult.id)]
+    answers = [
+        {
+            "test_result_id": r_id, "question_id": rng.choice(question_ids),
+            "is_correct": rng.random() < 0.6, "time_taken_seconds": rng.randint(20, 180),
+        }
+        for r_id in result_ids for _ in range(answers_per_student)
+    ]
+    db.bulk_insert_mappings(models.StudentAnswer, answers)
+    db.commit()
+    return {"students": len(student_ids), "questions": len(question_ids), "answers": len(answers)}
+
+# ---------------------------------------------------------
+# 2. Traffic replay
+# ---------------------------------------------------------
+
+def make_request(op, rng, students, questions):
+    """Returns (method, path, json body) for one operation."""
+    student_id = rng.randint(1, students)
+    if op == "study_plan":
+        return "GET", f"/study-plan/{student_id}", None
+    if op == "study_schedule":
+        return "GET", f"/study-schedule/{student_id}?days_remaining=30&hours_per_day=4", None
+    if op == "submit":
+        # Distinct ids: the API rejects a question answered twice in one submission
+        answers = [
+            {"question_id": question_id, "is_correct": rng.random() < 0.6,
+             "time_taken_seconds": rng.randint(20, 180)}
+            for question_id in rng.sample(range(1, questions + 1), 10)
+        ]
+        return "POST", "/mock-test-result", {"student_id": student_id, "answers": answers}
+    if op == "upload":
+        batch = [
+            {"subject": "Subject 0", "topic": "Topic 0", "content": f"Load test question {uuid.uuid4()}",
+             "year": 2025, "marks": 5}
+            for _ in range(20)
+        ]
+        return "POST", "/upload-question-paper", {"questions": batch}
+    raise ValueError(f"Unknown operation: {op}")
+
+async def replay(base_url, profile, duration, concurrency, students, questions, seed=0):
+    """
+    Runs `concurrency` workers for `duration` seconds.
+    Returns {op: [(latency_seconds, ok), ...]} and the elapsed wall time.
+    """
+    import httpx
+
+    ops, weights = zip(*PROFILES[profile].items())
+    samples = {op: [] for op in ops}
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id, client):
+        rng = random.Random(seed + worker_id)
+        while time.perf_counter() < deadline:
+            op = rng.choices(ops, weights)[0]
+            method, path, body = make_request(op, rng, students, questions)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            samples[op].append((time.perf_counter() - start, ok))
+
+    started = time.perf_counter()
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        await asyncio.gather(*(worker(i, client) for i in range(concurrency)))
+    return samples, time.perf_counter() - started
+
+# ---------------------------------------------------------
+# 3. Reporting and thresholds
+# ---------------------------------------------------------
+
+def summarize(samples, elapsed):
+    """Per-endpoint request count, throughput, latency percentiles (ms) and error rate."""
+    report = {}
+    for op, rows in samples.items():
+        if not rows:
+            continue
+        latencies = np.array([latency for latency, _ in rows]) * 1000
+        errors = sum(1 for _, ok in rows if not ok)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        report[op] = {
+            "requests": len(rows),
+            "throughput_rps": len(rows) / elapsed,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "error_rate": errors / len(rows),
+        }
+    return report
+
+def check_thresholds(report, max_p95_ms=None, max_error_rate=None, per_endpoint=None):
+    """
+    Returns a list of human-readable violations (empty if all limits hold).
+    `per_endpoint` overrides the global limits: {op: {"p95_ms": .., "error_rate": ..}}.
+    """
+    violations = []
+    for op, stats in report.items():
+        limits = {"p95_ms": max_p95_ms, "error_rate": max_error_rate}
+        limits.update((per_endpoint or {}).get(op, {}))
+        for metric, limit in limits.items():
+            if limit is not None and stats[metric] > limit:
+                violations.append(f"{op}: {metric} {stats[metric]:.3f} > {limit}")
+    return violations
+
+def print_report(report):
+    print(f"{'endpoint':<16}{'requests':>10}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    for op, s in report.items():
+        print(f"{op:<16}{s['requests']:>10}{s['throughput_rps']:>10.1f}{s['p50_ms']:>10.1f}"
+              f"{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}{s['error_rate']:>9.2%}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_cmd = commands.add_parser("seed", help="Populate DATABASE_URL with synthetic data")
+    seed_cmd.add_argument("--students", type=int, default=1000)
+    seed_cmd.add_argument("--subjects", type=int, default=5)
+    seed_cmd.add_argument("--topics", type=int, default=100)
+    seed_cmd.add_argument("--questions-per-topic", type=int, default=20)
+    seed_cmd.add_argument("--answers-per-student", type=int, default=50)
+
+    run_cmd = commands.add_parser("run", help="Replay traffic against a running API")
+    run_cmd.add_argument("--url", default="http://localhost:8000")
+    run_cmd.add_argument("--profile", choices=sorted(PROFILES), default="exam_day")
+    run_cmd.add_argument("--duration", type=float, default=30, help="Seconds")
+    run_cmd.add_argument("--concurrency", type=int, default=20)
+    run_cmd.add_argument("--students", type=int, default=1000, help="Student ids to draw from")
+    run_cmd.add_argument("--questions", type=int, default=2000, help="Question ids to draw from")
+    run_cmd.add_argument("--max-p95-ms", type=float)
+    run_cmd.add_argument("--max-error-rate", type=float)
+    run_cmd.add_argument("--thresholds", help="JSON file with per-endpoint limits")
+    run_cmd.add_argument("--output", help="Write the report as JSON")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "seed":
+        from app import models
+        from app.database import SessionLocal, engine
+        models.Base.metadata.create_all(bind=engine)
+        db = SessionLocal()
+        try:
+            counts = generate(db, args.students, args.subjects, args.topics,
+                              args.questions_per_topic, args.answers_per_student)
+        finally:
+            db.close()
+        print(f"Seeded {counts}")
+        return 0
+
+    samples, elapsed = asyncio.run(replay(
+        args.url, args.profile, args.duration, args.concurrency, args.students, args.questions
+    ))
+    report = summarize(samples, elapsed)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    per_endpoint = None
+    if args.thresholds:
+        with open(args.thresholds) as f:
+            per_endpoint = json.load(f)
+    violations = check_thresholds(report, args.max_p95_ms, args.max_error_rate, per_endpoint)
+    for violation in violations:
+        print(f"THRESHOLD EXCEEDED {violation}")
+    return 1 if violations else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
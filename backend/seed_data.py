@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, engine
-from app import models
+from app import models, dedup, cohorts
 import random
 
 def seed():
@@ -47,10 +47,13 @@ def seed():
             
             # Create Questions (varying importance)
             for i in range(5):
+                content = f"Question {i+1} about {topic_name}"
+                year = random.choice([2023, 2024, 2025])
                 q = models.Question(
-                    content=f"Question {i+1} about {topic_name}",
+                    content=content,
                     topic_id=topic.id,
-                    year=random.choice([2023, 2024, 2025]),
+                    year=year,
+                    content_hash=dedup.content_hash(content, year, topic.id),
                     marks=random.choice([2, 5, 10]),
                     difficulty=random.choice(["Easy", "Medium", "Hard"])
                 )
@@ -69,6 +72,7 @@ def seed():
     db.add(tr)
     db.commit()
 
+    answers = []
     for q in all_questions:
         # Simulate correctness
         if "Calculus" in q.topic.name:
@@ -85,7 +89,10 @@ def seed():
             time_taken_seconds=random.randint(30, 120)
         )
         db.add(ans)
+        answers.append((q.id, is_correct))
     
+    # Per-topic rollups used by the cohort dashboards
+    cohorts.record_answers(db, student.id, answers)
     db.commit()
     print("Seeding complete.")
     db.close()
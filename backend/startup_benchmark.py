@@ -0,0 +1,99 @@
+"""
+Startup-Time Benchmark for the Study Priority Engine API
+
+Starts the app in fresh interpreter processes and measures, per run:
+  - import_ms:  `import app.main` (what a container pays before it can listen)
+  - serving_ms: lifespan startup until requests are accepted
+  - ready_ms:   process start until /health/ready returns 200 (excluding the
+                test client's own import)
+Reports the median over the runs. Exits with status 1 if a threshold is exceeded.
+
+Usage (from backend/):
+    python startup_benchmark.py --runs 5 --max-import-ms 1500 --max-ready-ms 5000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Runs in a fresh interpreter; prints one JSON line of timings
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+numpy_loaded = "numpy" in sys.modules
+from fastapi.testclient import TestClient
+client = TestClient(app)
+entered = time.perf_counter()
+with client:
+    serving = time.perf_counter()
+    while client.get("/health/ready").status_code != 200:
+        if time.perf_counter() - start > {timeout}:
+            sys.exit("Not ready after {timeout}s: " + client.get("/health/ready").text)
+        time.sleep(0.005)
+    ready = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "serving_ms": (serving - entered) * 1000,
+    "ready_ms": (ready - start - (entered - imported)) * 1000,
+    "numpy_at_import": numpy_loaded,
+}}))
+"""
+
+def measure_once(database_url, timeout=60, env=None):
+    """Timings of one cold start against `database_url`."""
+    child_env = dict(os.environ, DATABASE_URL=database_url, **(env or {}))
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD.format(timeout=timeout)],
+        cwd=HERE, env=child_env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def measure(runs=5, database_url=None, timeout=60, env=None):
+    """Median timings over `runs` cold starts (a scratch SQLite file by default)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        url = database_url or f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+        samples = [measure_once(url, timeout, env) for _ in range(runs)]
+    report = {
+        metric: statistics.median(s[metric] for s in samples)
+        for metric in ("import_ms", "serving_ms", "ready_ms")
+    }
+    report["numpy_at_import"] = any(s["numpy_at_import"] for s in samples)
+    report["runs"] = runs
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", help="Defaults to a scratch SQLite file")
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-ready-ms", type=float)
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = measure(args.runs, args.database_url)
+    for metric in ("import_ms", "serving_ms", "ready_ms"):
+        print(f"{metric:<12}{report[metric]:>10.1f}")
+    print(f"numpy loaded at import: {report['numpy_at_import']}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    violations = [
+        f"{metric} {report[metric]:.1f} > {limit}"
+        for metric, limit in (("import_ms", args.max_import_ms), ("ready_ms", args.max_ready_ms))
+        if limit is not None and report[metric] > limit
+    ]
+    for violation in violations:
+        print(f"THRESHOLD EXCEEDED {violation}")
+    return 1 if violations else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
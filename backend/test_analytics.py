@@ -34,7 +34,7 @@ def create_mock_db(questions_data=None, answers_data=None):
         df_questions = pd.DataFrame(questions_data)
         query_obj.statement = Mock()
         mock_db.query.return_value.select_from.return_value.join.return_value.join.return_value.statement = query_obj.statement
-        pd.read_sql = Mock(side_effect=[df_questions, pd.DataFrame(answers_data) if answers_data else pd.DataFrame()])
+        pd.read_sql = Mock(side_effect=[df_questions, pd.DataFrame(answers_data).assign(attempts=1) if answers_data else pd.DataFrame()])
     else:
         # Empty database
         query_obj.statement = Mock()
@@ -156,7 +156,7 @@ def test_perfect_mastery_equals_zero_priority():
     mock_db.bind = Mock()
     
     df_q = pd.DataFrame(questions_data)
-    df_a = pd.DataFrame(answers_data)
+    df_a = pd.DataFrame(answers_data).assign(attempts=1)  # Raw answers: one attempt per row
     
     import app.analytics as analytics_module
     original_read_sql = pd.read_sql
@@ -256,7 +256,7 @@ def test_low_attempts_damping():
     mock_db.bind = Mock()
     
     df_q = pd.DataFrame(questions_data)
-    df_a = pd.DataFrame(answers_data)
+    df_a = pd.DataFrame(answers_data).assign(attempts=1)  # Raw answers: one attempt per row
     
     import app.analytics as analytics_module
     original_read_sql = pd.read_sql
@@ -354,7 +354,7 @@ def test_priority_ranking_order():
     mock_db.bind = Mock()
     
     df_q = pd.DataFrame(questions_data)
-    df_a = pd.DataFrame(answers_data)
+    df_a = pd.DataFrame(answers_data).assign(attempts=1)  # Raw answers: one attempt per row
     
     import app.analytics as analytics_module
     original_read_sql = pd.read_sql
@@ -374,13 +374,65 @@ def test_priority_ranking_order():
     pd.read_sql = original_read_sql
 
 
+def test_importance_cache_reused_per_catalog():
+    """
+    Test 8: Per-Catalog Importance Cache
+    Given: An importance cache and two plan requests for the same exam
+    Expected: Questions are read once; only answers are re-read
+    Rationale: Plan cost should not include re-aggregating the catalog
+    """
+    # Arrange
+    from app.analytics import ImportanceCache, build_priority_frame
+    questions_data = {
+        "question_id": [1, 2],
+        "year": [2025, 2024],
+        "marks": [10, 5],
+        "topic_id": [100, 101],
+        "topic_name": ["Calculus", "Algebra"],
+        "subject_name": ["Math", "Math"]
+    }
+    
+    mock_db = Mock()
+    mock_db.bind = Mock()
+    
+    df_q = pd.DataFrame(questions_data)
+    df_a = pd.DataFrame(columns=["is_correct", "topic_id"])
+    
+    original_read_sql = pd.read_sql
+    pd.read_sql = Mock(side_effect=[df_q, df_a, df_a])
+    cache = ImportanceCache()
+    
+    # Act
+    first = build_priority_frame(mock_db, student_id=1, exam_id=7, cache=cache)
+    second = build_priority_frame(mock_db, student_id=2, exam_id=7, cache=cache)
+    
+    # Assert
+    assert pd.read_sql.call_count == 3, "Importance should be computed once per catalog"
+    assert first["importance_score"].tolist() == second["importance_score"].tolist()
+    
+    cache.invalidate(7)
+    assert cache.get(7) is None, "Upload to a catalog must drop its cached importance"
+    
+    expiring = ImportanceCache(ttl=0)
+    expiring.set(7, first)
+    assert expiring.get(7) is None, "Entries must expire so other workers see uploads"
+    
+    versioned = ImportanceCache()
+    versioned.set(7, first, version=10)
+    assert versioned.get(7, version=10) is first
+    assert versioned.get(7, version=11) is None, "A newer catalog must not be served a stale frame"
+    
+    # Cleanup
+    pd.read_sql = original_read_sql
+
+
 # ============================================
 # INTEGRATION TEST (Full Flow)
 # ============================================
 
 def test_realistic_scenario():
     """
-    Test 8: Realistic Multi-Topic Scenario
+    Test 9: Realistic Multi-Topic Scenario
     Given: Mix of topics with varying importance and mastery
     Expected: Correct categorization (Study Now, Revise Later, etc.)
     """
@@ -417,7 +469,7 @@ def test_realistic_scenario():
     mock_db.bind = Mock()
     
     df_q = pd.DataFrame(questions_data)
-    df_a = pd.DataFrame(answers_data)
+    df_a = pd.DataFrame(answers_data).assign(attempts=1)  # Raw answers: one attempt per row
     
     import app.analytics as analytics_module
     original_read_sql = pd.read_sql
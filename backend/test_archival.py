@@ -0,0 +1,80 @@
+"""
+Tests for compaction of old answers into per-topic summaries.
+
+Run: pytest test_archival.py -v
+"""
+
+import datetime
+import gzip
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models, scheduler
+from app.analytics import calculate_student_mastery
+from app.archival import compact_answers
+
+NOW = datetime.datetime(2026, 6, 1)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    subject = models.Subject(name="Math")
+    session.add(subject)
+    session.flush()
+    for name in ["Calculus", "Algebra"]:
+        topic = models.Topic(name=name, subject_id=subject.id)
+        session.add(topic)
+        session.flush()
+        session.add(models.Question(content=name, year=2024, marks=5, topic_id=topic.id))
+    session.add(models.Student(name="A"))
+    session.flush()
+
+    # Two old tests (archived) and one recent test (kept raw)
+    for taken_at, answers in [
+        (datetime.datetime(2024, 3, 5), [(1, True, 60), (2, False, 30)]),
+        (datetime.datetime(2024, 3, 20), [(1, False, 90), (2, True, None)]),
+        (datetime.datetime(2026, 5, 1), [(1, True, 30)]),
+    ]:
+        result = models.TestResult(student_id=1, taken_at=taken_at)
+        session.add(result)
+        session.flush()
+        for question_id, is_correct, seconds in answers:
+            session.add(models.StudentAnswer(
+                test_result_id=result.id, question_id=question_id,
+                is_correct=is_correct, time_taken_seconds=seconds,
+            ))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_compaction_preserves_mastery_and_effort(db, tmp_path):
+    before = calculate_student_mastery(db, 1).set_index("topic_id")["mastery_score"].to_dict()
+    scheduler._effort_cache.clear()
+    effort_before = scheduler.estimate_topic_effort(db).to_dict()
+
+    stats = compact_answers(db, horizon_days=365, archive_dir=str(tmp_path), now=NOW)
+
+    assert stats["answers"] == 4
+    assert db.query(models.StudentAnswer).count() == 1, "Recent answers stay raw"
+    summary = db.query(models.AnswerSummary).filter_by(topic_id=1).one()
+    assert (summary.period_start, summary.correct, summary.attempts) == (datetime.date(2024, 3, 1), 1, 2)
+
+    assert calculate_student_mastery(db, 1).set_index("topic_id")["mastery_score"].to_dict() == before
+    scheduler._effort_cache.clear()
+    assert scheduler.estimate_topic_effort(db).to_dict() == pytest.approx(effort_before)
+
+    [path] = stats["files"]
+    with gzip.open(path, "rt") as f:
+        archived = [json.loads(line) for line in f]
+    assert [row["question_id"] for row in archived] == [1, 2, 1, 2]
+
+    # Nothing left to compact
+    assert compact_answers(db, horizon_days=365, archive_dir=str(tmp_path), now=NOW)["answers"] == 0
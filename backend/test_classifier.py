@@ -0,0 +1,100 @@
+"""
+Tests for the local TF-IDF / nearest-neighbour topic classifier.
+
+Run: pytest test_classifier.py -v
+"""
+
+from app import models
+from app.classifier import TopicClassifier, tokenize
+
+CALCULUS, ALGEBRA, OPTICS = 1, 2, 3
+MATH, PHYSICS = 10, 20
+
+TRAINING = [
+    (1, "Find the derivative of sin x", CALCULUS, MATH),
+    (2, "Evaluate the definite integral of x squared", CALCULUS, MATH),
+    (3, "Solve the quadratic equation x squared minus four", ALGEBRA, MATH),
+    (4, "Factor the polynomial and solve the equation", ALGEBRA, MATH),
+    (5, "Derive the lens equation for a thin convex lens", OPTICS, PHYSICS),
+]
+
+
+def test_predicts_nearest_topic():
+    clf = TopicClassifier()
+    clf.add_documents(TRAINING)
+
+    predicted = clf.predict(["Find the derivative of cos x", "Solve this quadratic equation"])
+    assert predicted == [CALCULUS, ALGEBRA]
+
+
+def test_subject_restricts_candidates():
+    clf = TopicClassifier()
+    clf.add_documents(TRAINING)
+
+    # "equation" appears in both subjects; the subject filter decides
+    assert clf.predict(["lens equation"], subject_ids=[PHYSICS]) == [OPTICS]
+    assert clf.predict(["lens equation"], subject_ids=[MATH]) == [ALGEBRA]
+
+
+def test_non_latin_text_is_tokenized():
+    clf = TopicClassifier()
+    clf.add_documents([
+        (1, "न्यूटन के गति के नियम लिखिए", 1, MATH),
+        (2, "द्विघात समीकरण हल कीजिए", 2, MATH),
+    ])
+
+    assert "न्यूटन" in tokenize("न्यूटन का नियम")
+    assert clf.predict(["समीकरण हल कीजिए"]) == [2]
+
+
+def test_incremental_update_and_unknown_text():
+    clf = TopicClassifier()
+    assert clf.predict(["anything"]) == [None]
+
+    clf.add_documents(TRAINING[:2])
+    clf.add_documents(TRAINING[2:])
+    assert clf.last_question_id == 5
+    assert clf.predict(["thin convex lens"]) == [OPTICS]
+    assert clf.predict(["completely unrelated words"]) == [None]
+
+
+def test_refresh_picks_up_late_commits_below_watermark(session_factory):
+    db = session_factory()
+    db.add(models.Subject(name="Math"))
+    db.flush()
+    db.add_all([models.Topic(name="Calculus", subject_id=1), models.Topic(name="Algebra", subject_id=1)])
+    db.add(models.Question(id=2, content="Find the derivative of sin x", year=2024, marks=5, topic_id=1))
+    db.commit()
+
+    clf = TopicClassifier()
+    clf.refresh(db)
+    # Id 1 was allocated earlier but its transaction commits after the refresh
+    db.add(models.Question(id=1, content="Solve the quadratic equation", year=2024, marks=5, topic_id=2))
+    db.commit()
+    clf.refresh(db)
+
+    assert clf.predict(["quadratic equation"]) == [2]
+    clf.refresh(db)
+    assert clf._n_docs == 2, "Already indexed questions are not added twice"
+
+
+def test_upload_auto_assigns_topics(client, session_factory):
+    client.post("/upload-question-paper", json={"questions": [
+        {"subject": "Math", "topic": "Calculus", "content": content, "year": 2024, "marks": 5}
+        for content in ["Find the derivative of sin x", "Evaluate the definite integral of x squared"]
+    ] + [
+        {"subject": "Math", "topic": "Algebra", "content": "Solve the quadratic equation x squared minus four",
+         "year": 2024, "marks": 5},
+    ]})
+    untagged = {"subject": "Math", "content": "Find the derivative of cos x", "year": 2025, "marks": 5}
+
+    assert client.post("/upload-question-paper", json={"questions": [untagged]}).status_code == 422
+    assigned = client.post("/upload-question-paper?auto_topic=true", json={"questions": [untagged]})
+    unknown = client.post("/upload-question-paper?auto_topic=true", json={"questions": [
+        dict(untagged, content="Completely unrelated words"),
+    ]})
+
+    assert assigned.json()["topics_auto_assigned"] == 1
+    stored = session_factory().query(models.Question).filter_by(year=2025).one()
+    assert stored.topic.name == "Calculus"
+    assert unknown.status_code == 422
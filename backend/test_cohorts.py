@@ -0,0 +1,140 @@
+"""
+Tests for the cohort rollups (incremental updates from submissions).
+
+Run: pytest test_cohorts.py -v
+"""
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import models, cohorts
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    subject = models.Subject(name="Math")
+    session.add(subject)
+    session.flush()
+    for name in ["Calculus", "Algebra"]:
+        topic = models.Topic(name=name, subject_id=subject.id)
+        session.add(topic)
+        session.flush()
+        for i in range(3):
+            session.add(models.Question(content=f"{name} {i}", year=2024, marks=5, topic_id=topic.id))
+    session.add_all([models.Student(name="A"), models.Student(name="B"), models.Cohort(name="Class", member_count=0)])
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_rollups_follow_submissions_and_members(db):
+    cohort = db.get(models.Cohort, 1)
+    # Student 1 answers before joining: 3/3 correct on Calculus (questions 1-3)
+    cohorts.record_answers(db, 1, [(1, True), (2, True), (3, True)])
+    cohorts.add_member(db, cohort, 1)
+    cohorts.add_member(db, cohort, 2)
+    db.commit()
+
+    # Student 2 answers after joining: 0/3 on Calculus, 2/3 on Algebra
+    cohorts.record_answers(db, 2, [(1, False), (2, False), (3, False), (4, True), (5, True), (6, False)])
+    db.commit()
+    db.refresh(cohort)
+
+    summary = {row["topic_name"]: row for row in cohorts.topic_summary(db, cohort)}
+    assert summary["Calculus"]["students_attempted"] == 2
+    assert summary["Calculus"]["avg_mastery"] == pytest.approx(0.5)
+    assert summary["Algebra"]["coverage"] == pytest.approx(0.5)
+    # Weakest by average over attempts (Calculus 0.5 < Algebra 0.67), not by the larger Calculus sum
+    assert cohorts.topic_summary(db, cohort, limit=1)[0]["topic_name"] == "Calculus"
+
+    histogram = cohorts.mastery_histogram(db, cohort, summary["Calculus"]["topic_id"])
+    assert histogram["buckets"][0] == 1 and histogram["buckets"][9] == 1
+    assert histogram["not_attempted"] == 0
+
+
+def test_histogram_moves_student_between_buckets(db):
+    cohort = db.get(models.Cohort, 1)
+    cohorts.add_member(db, cohort, 1)
+    cohorts.record_answers(db, 1, [(1, False), (2, False), (3, False)])
+    db.commit()
+    cohorts.record_answers(db, 1, [(1, True), (2, True), (3, True)])
+    db.commit()
+    db.refresh(cohort)
+
+    histogram = cohorts.mastery_histogram(db, cohort, 1)
+    assert sum(histogram["buckets"]) == 1
+    assert histogram["buckets"][cohorts.bucket_for(0.5)] == 1
+    assert cohorts.add_member(db, cohort, 1) is False
+
+
+def test_rebuild_backfills_answers_recorded_before_rollups(db):
+    cohort = db.get(models.Cohort, 1)
+    cohorts.add_member(db, cohort, 1)
+    # Answers stored directly, as before the rollups existed
+    result = models.TestResult(student_id=1)
+    db.add(result)
+    db.flush()
+    for question_id, is_correct in [(1, True), (2, True), (3, False), (4, False)]:
+        db.add(models.StudentAnswer(test_result_id=result.id, question_id=question_id, is_correct=is_correct))
+    db.commit()
+    assert cohorts.topic_summary(db, cohort) == []
+
+    assert cohorts.rebuild_rollups(db) == 2
+    db.commit()
+
+    summary = {row["topic_name"]: row for row in cohorts.topic_summary(db, cohort)}
+    assert summary["Calculus"]["avg_mastery"] == pytest.approx(2 / 3)
+    assert summary["Algebra"]["avg_mastery"] == pytest.approx(0.0)
+
+    # Later submissions build on the rebuilt counts
+    cohorts.record_answers(db, 1, [(4, True), (5, True)])
+    db.commit()
+    stats = db.get(models.StudentTopicStats, (1, 2))
+    assert (stats.correct, stats.attempts) == (2, 3)
+    assert sum(cohorts.mastery_histogram(db, cohort, 2)["buckets"]) == 1
+
+
+def test_rollup_rows_created_concurrently_are_incremented(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/cohorts.db")
+    models.Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    setup = Session()
+    setup.add(models.Cohort(name="Class", member_count=2))
+    setup.commit()
+    setup.close()
+
+    db = Session()
+    raced = []
+
+    @event.listens_for(db, "do_orm_execute")
+    def other_member_submits_after_our_read(state):
+        if raced or not state.is_select:
+            return None
+        result = state.invoke_statement()
+        raced.append(True)
+        other = Session()
+        other.add(models.CohortTopicStats(cohort_id=1, topic_id=1, students=1, mastery_sum=1.0))
+        other.add(models.CohortTopicHistogram(cohort_id=1, topic_id=1, bucket=cohorts.bucket_for(0.5), students=1))
+        other.commit()
+        other.close()
+        return result
+
+    cohorts._apply_changes(db, [1], [(1, None, 0.5)])
+    db.commit()
+
+    stats = db.get(models.CohortTopicStats, (1, 1))
+    assert (stats.students, stats.mastery_sum) == (2, pytest.approx(1.5))
+    assert db.query(models.CohortTopicHistogram).one().students == 2
+
+
+def test_weakest_topics_limit_is_validated(client):
+    client.post("/cohorts", json={"name": "Class"})
+
+    assert client.get("/cohorts/1/weakest-topics", params={"limit": 0}).status_code == 422
+    assert client.get("/cohorts/1/weakest-topics", params={"limit": 1000}).status_code == 422
+    assert client.get("/cohorts/1/weakest-topics", params={"limit": 3}).json() == []
@@ -0,0 +1,91 @@
+"""
+Tests for read-replica routing (using local SQLite files as primary/replicas)
+and for migrating a legacy schema.
+
+Run: pytest test_database.py -v
+"""
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from app.database import ReadRouter, init_schema, make_engine
+
+
+def make_db(path, name):
+    eng = make_engine(f"sqlite:///{path}")
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE role (name TEXT)"))
+        conn.execute(text("INSERT INTO role VALUES (:name)"), {"name": name})
+    return eng
+
+
+def read_role(router):
+    with router.connect() as conn:
+        return conn.execute(text("SELECT name FROM role")).scalar()
+
+
+def test_round_robin_across_replicas(tmp_path):
+    primary = make_db(tmp_path / "primary.db", "primary")
+    replicas = [make_db(tmp_path / "r1.db", "r1"), make_db(tmp_path / "r2.db", "r2")]
+    router = ReadRouter(replicas, primary)
+
+    assert [read_role(router) for _ in range(4)] == ["r1", "r2", "r1", "r2"]
+
+
+def test_failed_replica_is_skipped_then_primary_used(tmp_path):
+    primary = make_db(tmp_path / "primary.db", "primary")
+    broken = make_engine(f"sqlite:///{tmp_path}/missing/dir/replica.db")
+    router = ReadRouter([broken], primary, retry_after=60)
+
+    assert read_role(router) == "primary"
+    assert broken in router._down_until
+
+
+def test_no_replicas_reads_primary(tmp_path):
+    primary = make_db(tmp_path / "primary.db", "primary")
+
+    assert read_role(ReadRouter([], primary)) == "primary"
+
+
+# Tables as created before exams, dedup hashes and idempotency keys existed
+LEGACY_SCHEMA = [
+    "CREATE TABLE subjects (id INTEGER PRIMARY KEY, name VARCHAR)",
+    "CREATE UNIQUE INDEX ix_subjects_name ON subjects (name)",
+    "CREATE TABLE topics (id INTEGER PRIMARY KEY, name VARCHAR, subject_id INTEGER REFERENCES subjects (id))",
+    "CREATE TABLE questions (id INTEGER PRIMARY KEY, content VARCHAR, year INTEGER, marks INTEGER, "
+    "difficulty VARCHAR, topic_id INTEGER REFERENCES topics (id))",
+    "CREATE TABLE students (id INTEGER PRIMARY KEY, name VARCHAR)",
+    "CREATE TABLE test_results (id INTEGER PRIMARY KEY, student_id INTEGER REFERENCES students (id), taken_at DATETIME)",
+    "CREATE TABLE student_answers (id INTEGER PRIMARY KEY, test_result_id INTEGER REFERENCES test_results (id), "
+    "question_id INTEGER REFERENCES questions (id), is_correct BOOLEAN, time_taken_seconds INTEGER)",
+    "INSERT INTO subjects VALUES (1, 'Math')",
+    "INSERT INTO topics VALUES (1, 'Algebra', 1)",
+    "INSERT INTO questions VALUES (1, 'Solve x + 1 = 2', 2024, 4, 'Easy', 1)",
+]
+
+
+def test_init_schema_migrates_legacy_database(tmp_path):
+    eng = make_engine(f"sqlite:///{tmp_path}/legacy.db")
+    with eng.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            conn.execute(text(statement))
+
+    init_schema(bind=eng)
+    init_schema(bind=eng)  # Idempotent
+
+    columns = {c["name"] for c in inspect(eng).get_columns("questions")}
+    assert {"exam_id", "content_hash"} <= columns
+    with eng.begin() as conn:
+        assert conn.execute(text("SELECT content_hash FROM questions")).scalar().startswith("v2:")
+        # Subject names are unique per exam now, and still unique in the global catalog
+        conn.execute(text("INSERT INTO exams (id, name) VALUES (1, 'JEE'), (2, 'NEET')"))
+        conn.execute(text("INSERT INTO subjects (name, exam_id) VALUES ('Math', 1), ('Math', 2)"))
+        conn.execute(text("INSERT INTO test_results (student_id, idempotency_key) VALUES (1, 'k')"))
+    for statement in [
+        "INSERT INTO subjects (name, exam_id) VALUES ('Math', NULL)",
+        "INSERT INTO subjects (name, exam_id) VALUES ('Math', 1)",
+        "INSERT INTO test_results (student_id, idempotency_key) VALUES (1, 'k')",
+    ]:
+        with pytest.raises(IntegrityError), eng.begin() as conn:
+            conn.execute(text(statement))
@@ -0,0 +1,69 @@
+"""
+Tests for question de-duplication (content hash + MinHash near duplicates).
+
+Run: pytest test_dedup.py -v
+"""
+
+from app import models
+from app.database import init_schema
+from app.dedup import normalize_text, content_hash, NearDuplicateIndex
+
+PAPER = {"questions": [
+    {"subject": "Math", "topic": "Calculus", "content": "Differentiate x^2.", "year": 2024, "marks": 2},
+    {"subject": "Math", "topic": "Algebra", "content": "Factorise x^2 - 1.", "year": 2024, "marks": 3},
+]}
+
+
+def test_content_hash_ignores_case_and_spacing():
+    assert normalize_text("  What is   X^2? ") == "what is x 2"
+    assert content_hash("  What is   X^2? ", 2024, 1) == content_hash("what is x^2?", 2024, 1)
+    # Compatibility forms (full-width letters) are folded by NFKC
+    assert content_hash("Ｆｉｎｄ x", 2024, 1) == content_hash("find x", 2024, 1)
+
+
+def test_content_hash_keeps_operators_and_scripts():
+    assert content_hash("Factorise x^2 - 1", 2024, 1) != content_hash("Factorise x^2 + 1", 2024, 1)
+    assert content_hash("x < y", 2024, 1) != content_hash("x > y", 2024, 1)
+    assert content_hash("न्यूटन का पहला नियम लिखिए", 2024, 1) != content_hash("ओम का नियम लिखिए", 2024, 1)
+    assert content_hash("Straße", 2024, 1) == content_hash("STRASSE", 2024, 1)
+
+
+def test_content_hash_depends_on_year_and_topic():
+    base = content_hash("Define entropy.", 2024, 1)
+
+    assert content_hash("Define entropy.", 2023, 1) != base
+    assert content_hash("Define entropy.", 2024, 2) != base
+
+
+def test_near_duplicate_index_flags_reprints():
+    index = NearDuplicateIndex()
+    index.add(1, "State and prove the mean value theorem for a continuous function on a closed interval")
+
+    match = index.query("State and prove the mean value theorem for a continuous function on a closed interval.")
+    assert match is not None
+    assert match[0] == 1
+    assert match[1] >= index.threshold
+
+    assert index.query("Explain the photoelectric effect and derive Einstein's equation") is None
+
+
+def test_reupload_is_skipped(client, session_factory):
+    first = client.post("/upload-question-paper", json=PAPER).json()
+    second = client.post("/upload-question-paper", json=PAPER).json()
+
+    assert (first["questions_uploaded"], first["duplicates_skipped"]) == (2, 0)
+    assert (second["questions_uploaded"], second["duplicates_skipped"]) == (0, 2)
+    assert session_factory().query(models.Question).count() == 2
+
+
+def test_backfilled_legacy_questions_are_recognised(client, engine, session_factory):
+    client.post("/upload-question-paper", json=PAPER)
+    db = session_factory()
+    db.query(models.Question).update({models.Question.content_hash: None})  # Stored before hashing existed
+    db.query(models.Question).filter_by(id=1).update({models.Question.content_hash: "0" * 40})  # Old normalization
+    db.commit()
+
+    init_schema(engine)
+
+    assert client.post("/upload-question-paper", json=PAPER).json()["duplicates_skipped"] == 2
+    assert db.query(models.Question).count() == 2
@@ -0,0 +1,51 @@
+"""
+Tests for the load-testing harness (data generator, reporting, thresholds).
+
+Run: pytest test_load_test.py -v
+"""
+
+import random
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from load_test import generate, summarize, check_thresholds, make_request, PROFILES
+
+
+def test_generator_scales_with_arguments():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    counts = generate(db, students=10, subjects=2, topics=4, questions_per_topic=3, answers_per_student=5)
+
+    assert counts == {"students": 10, "questions": 12, "answers": 50}
+    assert db.query(models.Topic).count() == 4
+    db.close()
+
+
+def test_summary_and_thresholds():
+    samples = {
+        "study_plan": [(0.010, True)] * 90 + [(0.200, True)] * 9 + [(0.500, False)],
+        "submit": [],
+    }
+    report = summarize(samples, elapsed=10)
+
+    assert list(report) == ["study_plan"]
+    assert report["study_plan"]["throughput_rps"] == pytest.approx(10)
+    assert report["study_plan"]["error_rate"] == pytest.approx(0.01)
+    assert report["study_plan"]["p50_ms"] == pytest.approx(10)
+
+    assert check_thresholds(report, max_p95_ms=500, max_error_rate=0.05) == []
+    assert len(check_thresholds(report, max_p95_ms=50)) == 1
+    # Per-endpoint limits override the global ones
+    assert check_thresholds(report, max_p95_ms=50, per_endpoint={"study_plan": {"p95_ms": 500}}) == []
+
+
+def test_every_profile_operation_builds_a_request():
+    rng = random.Random(0)
+    for op in {op for profile in PROFILES.values() for op in profile}:
+        method, path, _ = make_request(op, rng, students=10, questions=10)
+        assert method in ("GET", "POST") and path.startswith("/")
@@ -0,0 +1,63 @@
+"""
+Tests for the study-schedule optimizer.
+
+Run: pytest test_scheduler.py -v
+"""
+
+import datetime
+
+import pandas as pd
+
+from app.scheduler import build_schedule, REVIEW_HOURS
+
+
+def make_priorities(rows):
+    return pd.DataFrame(rows, columns=["topic_id", "topic_name", "subject", "priority_score", "mastery_score"])
+
+
+def sessions(schedule, kind=None):
+    return [
+        (day["day"], s["topic_name"], s["hours"])
+        for day in schedule["days"] for s in day["sessions"]
+        if kind is None or s["kind"] == kind
+    ]
+
+
+def test_schedule_respects_daily_budget_and_order():
+    priorities = make_priorities([
+        (1, "Calculus", "Math", 0.9, 0.0),
+        (2, "Algebra", "Math", 0.5, 0.5),
+        (3, "Optics", "Physics", 0.0, 1.0),  # Nothing to gain: never scheduled
+    ])
+    schedule = build_schedule(priorities, pd.Series(dtype=float), days_remaining=5, hours_per_day=2,
+                              start_date=datetime.date(2025, 1, 1))
+
+    assert len(schedule["days"]) == 5
+    assert schedule["days"][0]["date"] == datetime.date(2025, 1, 1)
+    for day in schedule["days"]:
+        assert sum(s["hours"] for s in day["sessions"]) <= 2
+
+    study = sessions(schedule, "study")
+    assert study[0][1] == "Calculus", "Highest priority topic is studied first"
+    assert "Optics" not in {name for _, name, _ in study}
+
+
+def test_revisions_follow_spaced_offsets():
+    priorities = make_priorities([(1, "Calculus", "Math", 0.9, 0.0)])
+    schedule = build_schedule(priorities, pd.Series(dtype=float), days_remaining=10, hours_per_day=4)
+
+    # 2h of study finishes on day 1; revisions on days 1+1, 1+3, 1+7
+    assert sessions(schedule, "revise") == [(2, "Calculus", REVIEW_HOURS), (4, "Calculus", REVIEW_HOURS), (8, "Calculus", REVIEW_HOURS)]
+
+
+def test_budget_drops_low_value_topics():
+    priorities = make_priorities([
+        (1, "Calculus", "Math", 0.9, 0.0),
+        (2, "Algebra", "Math", 0.1, 0.0),
+    ])
+    # Slow topic: 3x the average answer time
+    effort = pd.Series({2: 3.0})
+    schedule = build_schedule(priorities, effort, days_remaining=1, hours_per_day=3)
+
+    assert schedule["unscheduled_topics"] == ["Algebra"]
+    assert schedule["planned_hours"] == 2.0
@@ -0,0 +1,53 @@
+"""
+Tests for the fast study-plan serialization path.
+
+Run: pytest test_serialization.py -v
+"""
+
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from app import schemas
+from app.serialization import frame_to_records, serialize_study_plan
+
+
+def make_priority_frame():
+    return pd.DataFrame({
+        "topic_id": np.array([100, 101], dtype=np.int64),
+        "topic_name": ["Calculus", "Algebra"],
+        "subject": ["Math", "Math"],
+        "frequency": np.array([5, 3], dtype=np.int64),
+        "importance_score": np.array([0.9, 0.4]),
+        "mastery_score": np.array([0.0, 0.7]),
+        "priority_score": np.array([0.9, 0.12]),
+        "recommendation": ["Study Now", "Revise Later"],
+    })
+
+
+def test_frame_to_records_keeps_only_schema_fields():
+    records = frame_to_records(make_priority_frame())
+
+    assert len(records) == 2
+    assert list(records[0]) == list(schemas.TopicPriority.model_fields)
+    # Values must be plain Python types, not NumPy scalars
+    assert type(records[0]["importance_score"]) is float
+
+
+def test_serialized_plan_matches_schema():
+    generated_at = datetime(2025, 1, 1, 12, 30)
+    body = serialize_study_plan(7, generated_at, make_priority_frame())
+
+    plan = schemas.StudyPlan.model_validate_json(body)
+    assert plan.student_id == 7
+    assert plan.generated_at == generated_at
+    assert [p.topic_name for p in plan.priorities] == ["Calculus", "Algebra"]
+    assert "topic_id" not in json.loads(body)["priorities"][0]
+
+
+def test_empty_frame_serializes_to_empty_list():
+    body = serialize_study_plan(1, datetime(2025, 1, 1), pd.DataFrame())
+
+    assert json.loads(body)["priorities"] == []
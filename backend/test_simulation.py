@@ -0,0 +1,73 @@
+"""
+Tests for batched what-if scenario evaluation.
+
+Run: pytest test_simulation.py -v
+"""
+
+import pandas as pd
+import pytest
+
+from app import models
+from app.simulation import simulate_scenarios
+
+
+def make_topic_stats():
+    return pd.DataFrame({
+        "topic_id": [100, 101],
+        "topic_name": ["Calculus", "Algebra"],
+        "subject_name": ["Math", "Math"],
+        "norm_freq": [1.0, 0.0],
+        "norm_marks": [1.0, 0.5],
+        "norm_recency": [0.0, 1.0],
+    })
+
+
+def test_baseline_matches_importance_formula():
+    mastery = pd.DataFrame({"topic_id": [100], "mastery_score": [0.5]})
+    [baseline] = simulate_scenarios(make_topic_stats(), mastery, [{}])
+
+    calculus = next(t for t in baseline if t["topic_name"] == "Calculus")
+    assert calculus["importance_score"] == pytest.approx(0.35 + 0.45)
+    assert calculus["priority_score"] == pytest.approx(0.8 * 0.5)
+
+
+def test_mastery_override_and_weights_in_one_pass():
+    mastery = pd.DataFrame(columns=["topic_id", "mastery_score"])
+    scenarios = [
+        {},
+        {"mastery": {"Calculus": 0.95}},
+        {"weights": (0.0, 0.0, 1.0)},
+    ]
+    baseline, mastered, recency_only = simulate_scenarios(make_topic_stats(), mastery, scenarios)
+
+    assert baseline[0]["topic_name"] == "Calculus"
+    assert mastered[-1]["topic_name"] == "Calculus"
+    assert mastered[-1]["recommendation"] == "Mastered"
+    assert recency_only[0]["topic_name"] == "Algebra"
+    assert recency_only[1]["priority_score"] == 0.0
+
+
+def test_empty_catalog():
+    empty = pd.DataFrame()
+    assert simulate_scenarios(empty, empty, [{}, {}]) == [[], []]
+
+
+def test_partial_weight_override_keeps_catalog_profile(client, session_factory):
+    db = session_factory()
+    db.add_all([models.Exam(name="Boards"), models.Student(name="A")])
+    db.commit()
+
+    client.post("/students/1/exams/1")
+    client.post("/upload-question-paper", json={"exam_id": 1, "questions": [
+        {"subject": "Math", "topic": "Calculus", "content": "Q1", "year": 2025, "marks": 10},
+        {"subject": "Math", "topic": "Algebra", "content": "Q2", "year": 2015, "marks": 2},
+    ]})
+    client.put("/weight-profile", json={"exam_id": 1, "w_freq": 0.0, "w_marks": 0.0, "w_recency": 1.0, "reference_year": 2025})
+
+    result = client.post("/what-if/1", json={"scenarios": [
+        {"weights": {"marks": 1.0}},
+        {"weights": {"freq": 0.0, "marks": 1.0, "recency": 1.0}},
+    ]}).json()
+
+    partial, explicit = result["scenarios"]
+    assert partial["priorities"] == explicit["priorities"], "Omitted weights must come from the stored profile"
@@ -0,0 +1,75 @@
+"""
+Tests for lazy startup and the health endpoints.
+
+Run: pytest test_startup.py -v
+"""
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import StaticPool
+
+from app import database, main
+from startup_benchmark import measure
+
+
+def test_app_imports_without_analytics_engine():
+    report = measure(runs=1, database_url="sqlite://")
+
+    assert report["numpy_at_import"] is False, "numpy/pandas must not load before the server listens"
+    assert report["ready_ms"] >= report["import_ms"]
+
+
+def test_readiness_follows_warm_up(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(main, "startup", main.StartupState())
+
+    client = TestClient(main.app)
+    assert client.get("/health/live").status_code == 200
+    assert client.get("/health/ready").status_code == 503, "Not ready before the lifespan runs"
+
+    with client:
+        deadline = time.monotonic() + 30
+        while (ready := client.get("/health/ready")).status_code != 200:
+            assert time.monotonic() < deadline, ready.json()
+            time.sleep(0.01)
+
+    assert ready.json()["checks"] == {"schema": True, "analytics": True, "database": True}
+    assert "test_results" in inspect(engine).get_table_names()
+
+
+def test_warm_up_retries_schema_until_database_is_up(monkeypatch):
+    attempts = []
+
+    def init_schema():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise OperationalError("SELECT 1", {}, ConnectionError("database is starting"))
+
+    monkeypatch.setattr(database, "init_schema", init_schema)
+    monkeypatch.setattr(main, "WARM_UP_RETRY_SECONDS", 0)
+    state = main.StartupState()
+    main.warm_up(state)
+
+    assert len(attempts) == 3
+    assert state.schema_ready.is_set() and state.engine_ready.is_set()
+    assert state.error is None and not state.fatal
+
+
+def test_failed_preload_fails_liveness(monkeypatch):
+    monkeypatch.setattr(database, "engine", create_engine("sqlite://"))
+    monkeypatch.setattr(database, "AUTO_CREATE_TABLES", False)
+    monkeypatch.setattr(main, "LAZY_MODULES", (main.LazyModule("no_such_module"),))
+    monkeypatch.setattr(main, "startup", main.StartupState())
+    with pytest.raises(ImportError):
+        main.warm_up(main.startup)
+
+    client = TestClient(main.app)
+    live = client.get("/health/live")
+    assert live.status_code == 503
+    assert live.json()["status"] == "failed"
+    assert client.get("/health/ready").json()["status"] == "failed"
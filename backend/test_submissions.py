@@ -0,0 +1,81 @@
+"""
+Tests for idempotent mock-test submissions.
+
+Run: pytest test_submissions.py -v
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from app import cohorts, models
+
+ANSWER = {"question_id": 1, "is_correct": True, "time_taken_seconds": 30}
+
+
+@pytest.fixture(autouse=True)
+def catalog(session_factory):
+    db = session_factory()
+    subject = models.Subject(name="Math")
+    db.add(subject)
+    db.flush()
+    topic = models.Topic(name="Algebra", subject_id=subject.id)
+    db.add(topic)
+    db.flush()
+    db.add(models.Question(content="Solve x + 1 = 2", year=2024, marks=4, topic_id=topic.id))
+    db.add(models.Student(name="A"))
+    db.commit()
+    db.close()
+
+
+def test_retry_with_same_key_replays_stored_result(client, session_factory):
+    body = {"student_id": 1, "answers": [ANSWER]}
+
+    first = client.post("/mock-test-result", json=body, headers={"Idempotency-Key": "k1"})
+    retry = client.post("/mock-test-result", json=body, headers={"Idempotency-Key": "k1"})
+
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    db = session_factory()
+    assert db.query(models.TestResult).count() == 1
+    assert db.query(models.StudentAnswer).count() == 1
+
+    # Same key, different payload is a client error
+    changed = {"student_id": 1, "answers": [dict(ANSWER, is_correct=False)]}
+    assert client.post("/mock-test-result", json=changed, headers={"Idempotency-Key": "k1"}).status_code == 422
+
+
+def test_duplicate_answers_are_rejected(client, session_factory):
+    response = client.post("/mock-test-result", json={"student_id": 1, "answers": [ANSWER, ANSWER]})
+
+    assert response.status_code == 422
+    assert session_factory().query(models.TestResult).count() == 0
+
+
+def test_unknown_student_is_a_client_error(client, session_factory):
+    db = session_factory()
+    db.execute(text("PRAGMA foreign_keys=ON"))  # Enforced like on Postgres
+    db.close()
+
+    for headers in ({}, {"Idempotency-Key": "k2"}):
+        response = client.post("/mock-test-result", json={"student_id": 999, "answers": [ANSWER]}, headers=headers)
+        assert response.status_code == 404
+
+
+def test_unknown_question_is_a_client_error(client, session_factory):
+    response = client.post("/mock-test-result", json={"student_id": 1, "answers": [ANSWER, dict(ANSWER, question_id=99)]})
+
+    assert response.status_code == 422
+    assert "99" in response.json()["detail"]
+    assert session_factory().query(models.TestResult).count() == 0
+
+
+def test_other_write_conflicts_are_not_blamed_on_questions(client, session_factory, monkeypatch):
+    def conflict(*args):
+        raise IntegrityError("INSERT INTO cohort_topic_stats", {}, Exception("duplicate key"))
+
+    monkeypatch.setattr(cohorts, "record_answers", conflict)
+    response = client.post("/mock-test-result", json={"student_id": 1, "answers": [ANSWER]})
+
+    assert response.status_code == 409
+    assert session_factory().query(models.TestResult).count() == 0
@@ -0,0 +1,59 @@
+"""
+Tests for weight profiles and recency curves.
+
+Run: pytest test_weights.py -v
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import models, weights
+from app.analytics import apply_profile
+from app.weights import ImportanceProfile, recency_scores
+
+YEARS = np.array([2025.0, 2023.0, 2020.0, 2026.0])
+
+
+def test_hyperbolic_matches_original_formula():
+    scores = recency_scores(YEARS, ImportanceProfile(reference_year=2025))
+
+    assert scores.tolist() == pytest.approx([1.0, 1 / 3, 1 / 6, 0.1])
+
+
+def test_exponential_and_windowed_curves():
+    exponential = recency_scores(YEARS, ImportanceProfile(recency_model="exponential", recency_half_life=2, reference_year=2025))
+    windowed = recency_scores(YEARS, ImportanceProfile(recency_model="windowed", recency_window=3, reference_year=2025))
+
+    assert exponential.tolist() == pytest.approx([1.0, 0.5, 0.5 ** 2.5, 0.1])
+    assert windowed.tolist() == [1.0, 1.0, 0.0, 0.1]
+
+
+def test_apply_profile_is_a_dot_product_over_cached_stats():
+    stats = pd.DataFrame({
+        "topic_id": [1, 2],
+        "avg_year": [2025.0, 2015.0],
+        "norm_freq": [0.0, 1.0],
+        "norm_marks": [1.0, 0.0],
+    })
+    marks_only = apply_profile(stats, ImportanceProfile(w_freq=0, w_marks=1, w_recency=0, reference_year=2025))
+    recency_only = apply_profile(stats, ImportanceProfile(w_freq=0, w_marks=0, w_recency=1, reference_year=2025))
+
+    assert marks_only["importance_score"].tolist() == [1.0, 0.0]
+    assert recency_only["importance_score"].tolist() == [1.0, 0.0]
+    assert "importance_score" not in stats, "Cached stats must not be modified"
+
+
+def test_cached_profile_follows_saves_from_other_workers(session_factory):
+    db, other_worker = session_factory(), session_factory()
+    weights.save_profile(db, None, {"w_freq": 1.0, "w_marks": 0.0, "w_recency": 0.0})
+    assert weights.get_profile(db).weights == (1.0, 0.0, 0.0)
+
+    # Unversioned edits are not seen: the profile is served from the cache
+    db.query(models.WeightProfile).update({"w_freq": 0.5})
+    db.commit()
+    assert weights.get_profile(db).weights == (1.0, 0.0, 0.0)
+
+    weights.save_profile(other_worker, None, {"w_freq": 0.0, "w_marks": 1.0, "w_recency": 0.0})
+    assert weights.get_profile(db).weights == (0.0, 1.0, 0.0)
+    assert weights.get_profile(db, exam_id=7).weights == (0.0, 1.0, 0.0), "Catalogs fall back to the global profile"